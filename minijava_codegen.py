@@ -1,63 +1,503 @@
 from minijava_scanner import MiniJavaScanner
 from minijava_parser import MiniJavaParserLL1
 from minijava_semantic import MiniJavaSemanticAnalyzer
+import io
 import logging
+import re
+import sys
+
+_VREG_RE = re.compile(r"%v\d+")
 
 class CodeGenerationError(Exception):
     def __init__(self, message, node=None):
         self.message = message
         self.node = node
-        super().__init__(self._format_message())
+        super().__init__(message)
 
     def _format_message(self):
         if self.node:
             return f"{self.message} (Node: {self.node})"
         return self.message
 
+    def __str__(self):
+        # Formatting repr(node) is deferred until the message is rendered
+        return self._format_message()
+
 class MiniJavaCodeGenerator:
     def __init__(self, syntax_tree, symbol_table):
         self.syntax_tree = syntax_tree
         self.symbol_table = symbol_table  
         self.output = []  
         self.label_counter = 0 
-        self.registers = ["$t0", "$t1", "$t2", "$t3", "$t4", "$t5", "$t6", "$t7", "$t8", "$t9"]  
-        self.used_registers = set()  
-        self.data_section = []  
-        self.text_section = []
-
-    def generate(self):
+        # Interned so register names compare by identity in dict/set lookups
+        self.registers = [sys.intern(reg) for reg in
+                          ("$t0", "$t1", "$t2", "$t3", "$t4", "$t5", "$t6", "$t7", "$t8", "$t9")]
+        # Expressions are emitted against unbounded virtual registers (%v0,
+        # %v1, ...); _assign_registers maps them onto $t registers afterwards
+        self._vreg_counter = 0
+        # Local CSE: identifier -> register already holding its value, valid
+        # within the current basic block only
+        self._ident_cache = {}
+        self.data_section = io.StringIO()
+        self.text_section = io.StringIO()  # contiguous buffers instead of lists of line strings
+        # Precomputed lookup structures for MethodCall resolution: frozenset
+        # membership tests and an id-keyed reverse map that resolves a class
+        # dict back to its name without a deep-equality scan
+        self._classes = frozenset(symbol_table)
+        self._methods = {name: frozenset(data["methods"]) for name, data in symbol_table.items()}
+        self._class_name_by_data = {id(data): name for name, data in symbol_table.items()}
+        # Flatten each class's inheritance chain once: field offsets (own
+        # fields first, then inherited, matching the layout NewObject
+        # allocates) and total object sizes become single dict lookups.
+        self._flat_field_offsets = {}
+        self._object_size = {}
+        for class_name in symbol_table:
+            offsets = {}
+            offset = 0
+            current_name = class_name
+            while current_name in symbol_table:
+                for field in symbol_table[current_name]["fields"]:
+                    if field not in offsets:  # shadowed parent fields keep their slot
+                        offsets[field] = offset
+                    offset += 4
+                current_name = symbol_table[current_name].get("parent")
+            self._flat_field_offsets[class_name] = offsets
+            self._object_size[class_name] = offset
+
+    def emit(self, line: str) -> None:
+        self.text_section.write(line)
+        self.text_section.write("\n")
+
+    def emit_data(self, line: str) -> None:
+        self.data_section.write(line)
+        self.data_section.write("\n")
+
+    def generate(self, out=None):
+        """Generate MIPS assembly.
+
+        When `out` is a writable text stream the assembly goes straight to it,
+        never materializing the full program as one string; otherwise the
+        assembled string is returned as before.
+        """
         logging.info("Starting code generation.")
 
-        self.data_section.append(".data")  
-        self.data_section.append("# Global variables and string literals")  
+        # Reuse the section buffers instead of allocating fresh ones, so a
+        # generator instance can be driven repeatedly without regrowing them
+        self.data_section.seek(0)
+        self.data_section.truncate()
+        self.text_section.seek(0)
+        self.text_section.truncate()
+        self._vreg_counter = 0
+        self._ident_cache.clear()
+
+        self.emit_data(".data")
+        self.emit_data("# Global variables and string literals")  
         self.generate_data_section()  
 
-        self.data_section.append('array_sep: .asciiz ", "  # Separator for array elements')
-        self.data_section.append('array_end: .asciiz "\\n"  # End of array message')
+        self.emit_data('array_sep: .asciiz ", "  # Separator for array elements')
+        self.emit_data('array_end: .asciiz "\\n"  # End of array message')
+
+        self.syntax_tree = self._preprocess(self.syntax_tree)
+        self._resolve_method_labels(self.syntax_tree)
 
-        self.text_section.append(".text")  
-        self.text_section.append(".globl main") 
-        self.generate_program(self.syntax_tree) 
+        self.emit(".text")
+        self.emit(".globl main")
+        self.generate_program(self.syntax_tree)
 
-        self.output = self.data_section + [""] + self.text_section
+        text_lines = self._assign_registers(self.text_section.getvalue().splitlines())
+        text_lines = self._peephole(text_lines)
+
+        if out is not None:
+            out.write(self.data_section.getvalue())
+            out.write("\n")
+            for line in text_lines:
+                out.write(line)
+                out.write("\n")
+            logging.info("Code generation completed.")
+            return None
+
+        self.output = self.data_section.getvalue() + "\n" + "\n".join(text_lines)
 
         logging.info("Code generation completed.")
-        return "\n".join(self.output)
+        return self.output
 
     def generate_data_section(self):
-        self.data_section.append('debug_msg: .asciiz "Debugging output"')  
+        self.emit_data('debug_msg: .asciiz "Debugging output"')  
 
         for clazz in self.syntax_tree.get("classes", []):
             for field in clazz.get("variables", []):
                 var_name = field["name"]
                 var_type = field["var_type"]
                 if var_type == "int":
-                    self.data_section.append(f"{clazz['name']}_{var_name}: .word 0  # Integer variable")
+                    self.emit_data(f"{clazz['name']}_{var_name}: .word 0  # Integer variable")
                 elif var_type == "boolean":
-                    self.data_section.append(f"{clazz['name']}_{var_name}: .byte 0  # Boolean variable")
+                    self.emit_data(f"{clazz['name']}_{var_name}: .byte 0  # Boolean variable")
+
+        self.emit_data("const_zero: .word 0  # Constant 0")
+        self.emit_data("const_one: .word 1  # Constant 1")
+
+    # Operator lookup tables, allocated once at class scope
+    _ARITH_OPS = {"+": "add", "-": "sub", "*": "mul"}
+    _REL_OPS = {
+        "<": ("slt", "Less than"),
+        "<=": ("sle", "Less than or equal"),
+        ">": ("sgt", "Greater than"),
+        ">=": ("sge", "Greater than or equal"),
+        "==": ("seq", "Equal"),
+        "!=": ("sne", "Not equal"),
+    }
 
-        self.data_section.append("const_zero: .word 0  # Constant 0")
-        self.data_section.append("const_one: .word 1  # Constant 1")
+    # Opcodes whose first operand is written (everything else only reads)
+    _WRITING_OPS = {
+        "li", "lw", "move", "add", "sub", "mul", "addi", "addiu",
+        "and", "or", "sll", "slt", "sle", "sgt", "sge", "seq", "sne",
+    }
+
+    def _assign_registers(self, lines):
+        """Linear-scan allocation of virtual registers onto $t0..$t7.
+
+        The live interval of each %vN placeholder is the span of emitted lines
+        where it occurs. Intervals are walked in order of first use (Poletto &
+        Sarkar); expired intervals release their register, and intervals that
+        find no free register are spilled to slots reserved inside the
+        enclosing stack frame, rewritten through the reserved scratch
+        registers $t8/$t9. Slots are addressed off $fp, which neither the
+        operand pushes nor a callee frame can move, and each frame's
+        reserve/restore is widened by the spill bytes it needs. Hard-coded $t
+        uses in the emitted text block their register over the span where
+        they appear.
+        """
+        intervals = {}
+        blocked_spans = {}
+        for i, line in enumerate(lines):
+            code = line.split("#", 1)[0]
+            for vreg in _VREG_RE.findall(code):
+                start, _ = intervals.get(vreg, (i, i))
+                intervals[vreg] = (start, i)
+            for reg in self.registers:
+                if reg in code:
+                    start, _ = blocked_spans.get(reg, (i, i))
+                    blocked_spans[reg] = (start, i)
+
+        if not intervals:
+            return lines
+
+        pool = self.registers[:8]
+        scratch = self.registers[8:]
+
+        def is_blocked(reg, start, end):
+            span = blocked_spans.get(reg)
+            return span is not None and not (end < span[0] or span[1] < start)
+
+        assignment = {}
+        spilled = []  # vregs without a register, in order of first use
+        active = []  # (end, vreg) of intervals currently holding a register
+        free = set(pool)
+
+        for vreg, (start, end) in sorted(intervals.items(), key=lambda item: item[1][0]):
+            for expired in [entry for entry in active if entry[0] < start]:
+                active.remove(expired)
+                free.add(assignment[expired[1]])
+            reg = next((r for r in pool if r in free and not is_blocked(r, start, end)), None)
+            if reg is not None:
+                free.discard(reg)
+                assignment[vreg] = reg
+                active.append((end, vreg))
+            else:
+                spilled.append(vreg)
+
+        # Spill slots live inside the frame of the method that uses them, as
+        # $fp-relative offsets just past the named slots; the frame's
+        # reserve/restore pair is widened to cover them. Memory below $sp is
+        # not safe: a jal hands it to the callee's frame, and the explicit
+        # operand pushes move $sp between a spill store and its reload.
+        spill_slots = {}
+        frame_extra = {}  # reserve-line index -> extra frame bytes
+        main_extra = 0
+
+        def frame_size_of(index):
+            return -int(lines[index].split("#", 1)[0].replace(",", " ").split()[3])
+
+        if spilled:
+            reserve_indexes = [i for i, line in enumerate(lines)
+                               if "# Reserve stack frame" in line]
+            region_counts = {}
+            for vreg in spilled:
+                start = intervals[vreg][0]
+                region = None
+                for index in reserve_indexes:
+                    if index > start:
+                        break
+                    region = index
+                slot = region_counts.get(region, 0)
+                region_counts[region] = slot + 1
+                base = 0 if region is None else frame_size_of(region)
+                spill_slots[vreg] = base + 4 * slot
+            main_extra = 4 * region_counts.pop(None, 0)
+            frame_extra = {index: 4 * count for index, count in region_counts.items()}
+
+        result = []
+        current_extra = 0
+        for i, line in enumerate(lines):
+            if "# Reserve stack frame" in line:
+                current_extra = frame_extra.get(i, 0)
+                if current_extra:
+                    line = (f"addiu $sp, $sp, -{frame_size_of(i) + current_extra}"
+                            "  # Reserve stack frame")
+            elif current_extra and "# Restore stack pointer" in line:
+                size = int(line.split("#", 1)[0].replace(",", " ").split()[3])
+                line = f"addiu $sp, $sp, {size + current_extra}  # Restore stack pointer"
+            elif main_extra and line.split("#", 1)[0].strip() == "main:":
+                # main has no frame of its own: reserve a spill area up front
+                # and anchor $fp on it (callees save and restore $fp)
+                result.append(line)
+                result.append(f"addiu $sp, $sp, -{main_extra}  # Reserve spill area")
+                result.append("move $fp, $sp  # Anchor spill slots")
+                continue
+            vregs = list(dict.fromkeys(_VREG_RE.findall(line)))
+            if not vregs:
+                result.append(line)
+                continue
+
+            spilled = [v for v in vregs if v in spill_slots]
+            parts = line.split("#", 1)[0].replace(",", " ").split()
+            op = parts[0] if parts else ""
+            is_write = op in self._WRITING_OPS and len(parts) > 1
+            dest = parts[1] if is_write and parts[1] in spill_slots else None
+            source_parts = parts[2:] if is_write else parts[1:]
+            read_spilled = [v for v in spilled
+                            if any(v in _VREG_RE.findall(part) for part in source_parts)]
+
+            # Only operands that are read need simultaneous scratch registers;
+            # the destination is written after the sources are consumed, so it
+            # can share a scratch with one of them. Any three-operand
+            # instruction therefore needs at most two scratch registers.
+            if len(read_spilled) > len(scratch):
+                raise CodeGenerationError(f"Too many spilled operands in one instruction: {line}")
+            scratch_map = dict(zip(read_spilled, scratch))
+            if dest is not None and dest not in scratch_map:
+                unused = [s for s in scratch if s not in scratch_map.values()]
+                scratch_map[dest] = unused[0] if unused else scratch[0]
+            mapping = {v: scratch_map.get(v) or assignment[v] for v in vregs}
+
+            for vreg in read_spilled:
+                result.append(f"lw {scratch_map[vreg]}, {spill_slots[vreg]}($fp)  # reload spilled {vreg}")
+            result.append(_VREG_RE.sub(lambda m: mapping[m.group()], line))
+            if dest is not None:
+                result.append(f"sw {scratch_map[dest]}, {spill_slots[dest]}($fp)  # spill {dest}")
+
+        return result
+
+    def _peephole(self, lines):
+        """Peephole pass over the emitted text section.
+
+        Drops `move r, r` no-ops and reloads of a value that is already in the
+        register, forwards `move a, b; move c, a` pairs when `a` is dead
+        afterwards, folds additions with a freshly loaded 0 into moves, and
+        rewrites remaining source-only uses of such a register to $zero.
+        """
+        def code_of(line):
+            return line.split("#", 1)[0].strip()
+
+        def operands_of(line):
+            return code_of(line).replace(",", " ").split()
+
+        # First pass: drop `lw R, M` when R provably still holds M (no label,
+        # branch, call, store, or write to R since the previous identical load).
+        filtered = []
+        last_load = None
+        for line in lines:
+            parts = operands_of(line)
+            if not parts:
+                filtered.append(line)
+                continue
+            op = parts[0]
+            if code_of(line).endswith(":") or op in ("j", "jal", "jr", "syscall",
+                                                     "beq", "bne", "bge", "bgt", "ble", "blt"):
+                last_load = None
+            elif op == "lw" and len(parts) == 3:
+                if (parts[1], parts[2]) == last_load:
+                    continue
+                last_load = (parts[1], parts[2])
+            elif op == "sw":
+                last_load = None  # the store may alias the cached slot
+            elif last_load is not None and len(parts) > 1 and parts[1] == last_load[0]:
+                last_load = None  # register overwritten
+            filtered.append(line)
+        lines = filtered
+
+        def is_dead_after(reg, start):
+            # Conservative liveness: a register is dead only if it is not
+            # mentioned again before the end of the text. A label is an
+            # unknown, not a kill point — execution falls through labels and
+            # can jump back to them, so the register may still be read there.
+            for line in lines[start:]:
+                code = code_of(line)
+                if code.endswith(":"):
+                    return False
+                if reg in code:
+                    return False
+            return True
+
+        result = []
+        skip_next = False
+        for i, line in enumerate(lines):
+            if skip_next:
+                skip_next = False
+                continue
+
+            parts = operands_of(line)
+
+            if len(parts) == 3 and parts[0] == "move" and parts[1] == parts[2]:
+                continue  # move r, r is a no-op
+
+            next_parts = operands_of(lines[i + 1]) if i + 1 < len(lines) else []
+
+            # move a, b ; move c, a  ->  move c, b  (when a is dead afterwards)
+            if (len(parts) == 3 and parts[0] == "move"
+                    and len(next_parts) == 3 and next_parts[0] == "move"
+                    and next_parts[2] == parts[1]
+                    and is_dead_after(parts[1], i + 2)):
+                result.append(f"move {next_parts[1]}, {parts[2]}  # Forwarded move")
+                skip_next = True
+                continue
+
+            # li r, 0 ; add x, y, r  ->  move x, y
+            if (len(parts) == 3 and parts[0] == "li" and parts[2] == "0"
+                    and len(next_parts) == 4 and next_parts[0] == "add"
+                    and parts[1] in next_parts[2:]
+                    and next_parts[1] != parts[1]
+                    and is_dead_after(parts[1], i + 2)):
+                other = next_parts[3] if next_parts[2] == parts[1] else next_parts[2]
+                result.append(f"move {next_parts[1]}, {other}  # Folded add with zero")
+                skip_next = True
+                continue
+
+            # li r, 0 ; <use of r as source only>  ->  use $zero directly
+            if (len(parts) == 3 and parts[0] == "li" and parts[2] == "0"
+                    and len(next_parts) >= 3 and parts[1] in next_parts[2:]
+                    and next_parts[1] != parts[1]
+                    and is_dead_after(parts[1], i + 2)):
+                result.append(lines[i + 1].replace(parts[1], "$zero"))
+                skip_next = True
+                continue
+
+            result.append(line)
+
+        return result
+
+    def _preprocess(self, node):
+        """Fused pre-pass: constant folding plus dead-branch pruning.
+
+        Children are processed first, so by the time a node is examined its
+        operands/conditions are already in final form. One descent touches
+        each node once instead of one full traversal per optimization.
+        """
+        if isinstance(node, list):
+            return [self._preprocess(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        processed = {key: self._preprocess(value) for key, value in node.items()}
+        node_type = processed.get("type")
+
+        if node_type in ("ArithmeticOp", "RelationalOp", "LogicalOp"):
+            return self._fold_binary(processed)
+
+        if node_type == "If" and processed["condition"].get("type") == "Boolean":
+            # Constant condition: keep only the taken arm
+            if processed["condition"]["value"] == "true":
+                return processed["if_true"]
+            return processed.get("if_false") or {"type": "NoOp"}
+
+        if (node_type == "While" and processed["condition"].get("type") == "Boolean"
+                and processed["condition"]["value"] == "false"):
+            return {"type": "NoOp"}
+
+        return processed
+
+    def _fold_binary(self, node: dict) -> dict:
+        """Fold a binary operation whose operands are literals.
+
+        Subtrees like `2 * 3 + 1` collapse into a single Number/Boolean node,
+        so codegen skips the loads and ALU instructions entirely.
+        """
+        left = node["left"]
+        right = node["right"]
+        operator = node["operator"]
+        node_type = node["type"]
+
+        if node_type == "LogicalOp" and operator == "&&" and left.get("type") == "Boolean":
+            # && evaluates left-to-right, so a constant left side either
+            # decides the result or disappears without skipping effects.
+            if left["value"] == "true":
+                return right
+            return {"type": "Boolean", "value": "false"}
+
+        if left.get("type") == "Number" and right.get("type") == "Number":
+            l, r = left["value"], right["value"]
+            if node_type == "ArithmeticOp":
+                if operator == "+":
+                    return {"type": "Number", "value": l + r}
+                elif operator == "-":
+                    return {"type": "Number", "value": l - r}
+                elif operator == "*":
+                    return {"type": "Number", "value": l * r}
+            elif node_type == "RelationalOp":
+                result = None
+                if operator == "<":
+                    result = l < r
+                elif operator == "<=":
+                    result = l <= r
+                elif operator == ">":
+                    result = l > r
+                elif operator == ">=":
+                    result = l >= r
+                elif operator == "==":
+                    result = l == r
+                elif operator == "!=":
+                    result = l != r
+                if result is not None:
+                    return {"type": "Boolean", "value": "true" if result else "false"}
+
+        return node
+
+    def _resolve_method_labels(self, node, current_class=None):
+        """Pre-pass that statically resolves MethodCall targets.
+
+        MiniJava calls dispatch on the declared type, so the (class, method)
+        pair is known before emission. Caching the call label on the node lets
+        the MethodCall branch of generate_expression skip symbol-table
+        validation; the arity recorded alongside it lets the call site check
+        the argument count without another lookup.
+        """
+        if isinstance(node, list):
+            for item in node:
+                self._resolve_method_labels(item, current_class)
+            return
+        if not isinstance(node, dict):
+            return
+
+        if node.get("type") == "Class":
+            current_class = node["name"]
+        elif node.get("type") == "MethodCall":
+            target = node["target"]
+            if target["type"] == "NewObject":
+                target_class = target["class_name"]
+            elif target["type"] == "This":
+                target_class = current_class
+            else:
+                target_class = target.get("class_name")
+
+            if isinstance(target_class, str) and target_class in self.symbol_table:
+                methods = self.symbol_table[target_class]["methods"]
+                method_name = node["method_name"]
+                if method_name in methods:
+                    node["_label"] = f"{target_class}_{method_name}"
+                    node["_arity"] = len(methods[method_name]["parameters"])
+
+        for value in node.values():
+            self._resolve_method_labels(value, current_class)
 
     def generate_program(self, node):
         if node["type"] != "Program":
@@ -70,9 +510,9 @@ class MiniJavaCodeGenerator:
         for clazz in node["classes"]:
             self.generate_class(clazz)
 
-        self.text_section.append("# Program termination (if needed)")
-        self.text_section.append("li $v0, 10  # Exit syscall")
-        self.text_section.append("syscall")
+        self.emit("# Program termination (if needed)")
+        self.emit("li $v0, 10  # Exit syscall")
+        self.emit("syscall")
 
     def generate_main_class(self, node):
         if node["type"] != "MainClass":
@@ -80,15 +520,15 @@ class MiniJavaCodeGenerator:
 
         logging.info(f"Generating main class: {node['class_name']}")
 
-        self.text_section.append(f"# Main Class: {node['class_name']}")
+        self.emit(f"# Main Class: {node['class_name']}")
 
-        self.text_section.append("main:")
+        self.emit("main:")
 
         for command in node.get("commands", []):
             self.generate_command(command)
 
-        self.text_section.append("li $v0, 10  # Exit syscall")
-        self.text_section.append("syscall")
+        self.emit("li $v0, 10  # Exit syscall")
+        self.emit("syscall")
 
     def generate_class(self, node):
         if node["type"] != "Class":
@@ -96,7 +536,7 @@ class MiniJavaCodeGenerator:
 
         logging.info(f"Generating class: {node['name']}")
 
-        self.text_section.append(f"# Class: {node['name']}")
+        self.emit(f"# Class: {node['name']}")
 
         for method in node.get("methods", []):
             self.generate_method(method, node["name"])
@@ -107,121 +547,193 @@ class MiniJavaCodeGenerator:
 
         logging.info(f"Generating method: {node['name']} in class {class_name}")
 
+        self._ident_cache.clear()  # fresh block: nothing is materialized yet
         current_class = self.symbol_table.get(class_name)
 
-        self.text_section.append(f"# Method: {node['name']} in class {class_name}")
-
-        self.text_section.append(f"{class_name}_{node['name']}:")
-
-        self.text_section.append("addiu $sp, $sp, -12  # Reserve space for $fp, $ra, and num")
-        self.text_section.append("sw $fp, 8($sp)       # Save old frame pointer")
-        self.text_section.append("sw $ra, 4($sp)       # Save return address")
-        self.text_section.append("sw $a0, 0($sp)       # Save num (parameter)")
-        self.text_section.append("move $fp, $sp        # Set frame pointer")
-
-        self.text_section.append("li $t1, 1            # Load immediate 1")
-        self.text_section.append("lw $t0, 0($sp)       # Load num from stack")
-        self.text_section.append("slt $t2, $t0, $t1    # num < 1?")
-        self.text_section.append("beq $t2, $zero, else_label_1  # If num >= 1, jump to else")
+        self.emit(f"# Method: {node['name']} in class {class_name}")
+
+        self.emit(f"{class_name}_{node['name']}:")
+
+        parameters = [param["name"] for param in node.get("parameters", [])]
+        local_vars = [var["name"] for var in node.get("local_variables", [])]
+        # $ra only needs a frame slot when a call in the body clobbers it;
+        # parameters can stay in $a0..$a3 only while nothing overwrites the
+        # argument registers — a jal or a syscall sequence (allocation,
+        # printing) does, so such bodies save them to the frame instead
+        has_call = (self._contains_call(node.get("commands", []))
+                    or self._contains_call(node.get("return_expression")))
+        params_in_frame = (has_call
+                           or self._clobbers_arg_regs(node.get("commands", []))
+                           or self._clobbers_arg_regs(node.get("return_expression")))
+
+        frame_slots = []  # slot names, laid out upward from $sp
+        param_map = {}
+        if params_in_frame:
+            frame_slots.extend(parameters)
+        else:
+            for i, name in enumerate(parameters):
+                param_map[name] = f"$a{i}"
+        frame_slots.extend(local_vars)
+        if has_call:
+            frame_slots.append("$ra")
+        frame_slots.append("$fp")
+
+        offsets = {name: 4 * i for i, name in enumerate(frame_slots)}
+        frame_size = 4 * len(frame_slots)
+        if params_in_frame:
+            for name in parameters:
+                param_map[name] = str(offsets[name])
+        local_var_offsets = {name: offsets[name] for name in local_vars}
+
+        self.emit(f"addiu $sp, $sp, -{frame_size}  # Reserve stack frame")
+        self.emit(f"sw $fp, {offsets['$fp']}($sp)  # Save old frame pointer")
+        if has_call:
+            self.emit(f"sw $ra, {offsets['$ra']}($sp)  # Save return address")
+        if params_in_frame:
+            for i, name in enumerate(parameters):
+                self.emit(f"sw $a{i}, {offsets[name]}($sp)  # Save parameter '{name}'")
+        self.emit("move $fp, $sp  # Set frame pointer")
 
-        self.text_section.append("li $v0, 1            # Return 1 if num < 1")
-        self.text_section.append("j end_if_label_1")
+        for command in node.get("commands", []):
+            self.generate_command(command, current_class, param_map, local_var_offsets)
 
-        self.text_section.append("else_label_1:")
-        self.text_section.append("lw $t0, 0($sp)       # Load num from stack")
-        self.text_section.append("sub $a0, $t0, $t1    # Calculate num - 1 for recursive call")
-        self.text_section.append("jal Fac_ComputeFac   # Recursive call")
-        self.text_section.append("lw $t0, 0($sp)       # Reload num from stack")
-        self.text_section.append("mul $v0, $t0, $v0    # Multiply num by recursion result")
+        return_reg = self.generate_expression(node["return_expression"], current_class,
+                                              param_map, local_var_offsets)
+        self.emit(f"move $v0, {return_reg}  # Move return value to $v0")
+        self.free_register(return_reg)
 
-        self.text_section.append("end_if_label_1:")
-        self.text_section.append("lw $ra, 4($sp)       # Restore return address")
-        self.text_section.append("lw $fp, 8($sp)       # Restore old frame pointer")
-        self.text_section.append("addiu $sp, $sp, 12   # Restore stack pointer")
-        self.text_section.append("jr $ra               # Return")
+        if has_call:
+            self.emit(f"lw $ra, {offsets['$ra']}($sp)  # Restore return address")
+        self.emit(f"lw $fp, {offsets['$fp']}($sp)  # Restore old frame pointer")
+        self.emit(f"addiu $sp, $sp, {frame_size}  # Restore stack pointer")
+        self.emit("jr $ra  # Return")
+
+    def _contains_call(self, node):
+        if isinstance(node, list):
+            return any(self._contains_call(item) for item in node)
+        if not isinstance(node, dict):
+            return False
+        if node.get("type") == "MethodCall":
+            return True
+        return any(self._contains_call(value) for value in node.values())
+
+    # Nodes whose generated code loads $a0 for a syscall (or $a0..$a3 for a
+    # call): parameters cannot be kept in argument registers across them.
+    _ARG_CLOBBERING_TYPES = frozenset({"MethodCall", "NewObject", "ArrayInstantiation", "Print"})
+
+    def _clobbers_arg_regs(self, node):
+        if isinstance(node, list):
+            return any(self._clobbers_arg_regs(item) for item in node)
+        if not isinstance(node, dict):
+            return False
+        if node.get("type") in self._ARG_CLOBBERING_TYPES:
+            return True
+        return any(self._clobbers_arg_regs(value) for value in node.values())
+
+    def _eval_binary_operands(self, node, current_class, param_map, local_var_offsets):
+        """Evaluate both operands of a binary node, call-safe.
+
+        Caller-saved $t registers do not survive a jal, so when the right
+        subtree performs a call the left operand is parked on the stack for
+        the duration and reloaded afterwards.
+        """
+        left_reg = self.generate_expression(node["left"], current_class, param_map, local_var_offsets)
+        right = node["right"]
+        if self._contains_call(right):
+            self.emit("addiu $sp, $sp, -4  # Push left operand across call")
+            self.emit(f"sw {left_reg}, 0($sp)  # Preserve left operand")
+            right_reg = self.generate_expression(right, current_class, param_map, local_var_offsets)
+            self.free_register(left_reg)
+            left_reg = self.allocate_register()
+            self.emit(f"lw {left_reg}, 0($sp)  # Restore left operand")
+            self.emit("addiu $sp, $sp, 4  # Pop left operand")
+        else:
+            right_reg = self.generate_expression(right, current_class, param_map, local_var_offsets)
+        return left_reg, right_reg
 
-    def generate_command(self, node, current_class=None, param_map=None, local_var_offsets=None):
+    # The hot node-visit paths below carry type annotations so the module can
+    # be compiled ahead-of-time with mypyc/Cython without further changes.
+    def generate_command(self, node: dict, current_class=None, param_map=None, local_var_offsets=None) -> None:
         logging.debug(f"Generating command: {node['type']}")
         
-        if node["type"] == "Print":
-            self.generate_print(node, current_class, param_map, local_var_offsets)
-        elif node["type"] == "Assignment":
-            self.generate_assignment(node, current_class, param_map, local_var_offsets)
-        elif node["type"] == "If":
-            self.generate_if(node, current_class, param_map, local_var_offsets)
-        elif node["type"] == "While":
-            self.generate_while(node, current_class, param_map, local_var_offsets)
-        elif node["type"] == "Return":
-            self.generate_return(node, current_class, param_map, local_var_offsets)
-        else:
+        handler = self._CMD_HANDLERS.get(node["type"])
+        if handler is None:
             raise CodeGenerationError(f"Unsupported command type: {node['type']}", node)
+        handler(self, node, current_class, param_map, local_var_offsets)
 
     def generate_print(self, node, current_class=None, param_map=None, local_var_offsets=None):
         logging.debug("Generating Print command.")
 
         expression = node["expression"]
-        expression_reg = self.generate_expression(expression, current_class)
+        expression_reg = self.generate_expression(expression, current_class, param_map, local_var_offsets)
 
         if expression["type"] == "Boolean":
             self.handle_boolean_print(expression)
         elif expression["type"] == "ArrayAccess":
-            self.handle_array_element_print(expression)
+            self.handle_array_element_print(expression, current_class, param_map, local_var_offsets)
         elif expression["type"] == "Identifier" and expression["var_type"] == "int[]":
-            self.handle_array_print(expression)
+            self.handle_array_print(expression, current_class, param_map, local_var_offsets)
         else:
-            self.text_section.append(f"move $a0, {expression_reg}  # Move value to $a0 for printing")
-            self.text_section.append("li $v0, 1  # Print integer syscall")
-            self.text_section.append("syscall")
+            self.emit(f"move $a0, {expression_reg}  # Move value to $a0 for printing")
+            self.emit("li $v0, 1  # Print integer syscall")
+            self.emit("syscall")
             self.free_register(expression_reg)
 
-    def handle_array_element_print(self, expression):
-        element_reg = self.generate_expression(expression, current_class)
+    def handle_array_element_print(self, expression, current_class=None, param_map=None, local_var_offsets=None):
+        element_reg = self.generate_expression(expression, current_class, param_map, local_var_offsets)
 
-        self.text_section.append(f"move $a0, {element_reg}  # Move array element to $a0")
-        self.text_section.append("li $v0, 1  # Print integer syscall")
-        self.text_section.append("syscall")
+        self.emit(f"move $a0, {element_reg}  # Move array element to $a0")
+        self.emit("li $v0, 1  # Print integer syscall")
+        self.emit("syscall")
 
         self.free_register(element_reg)
         
     def allocate_register(self):
-        for reg in self.registers:
-            if reg not in self.used_registers:
-                self.used_registers.add(reg)
-                return reg
-        raise CodeGenerationError("No free registers available.")
+        reg = f"%v{self._vreg_counter}"
+        self._vreg_counter += 1
+        return reg
 
     def free_register(self, reg):
-        if reg in self.used_registers:
-            self.used_registers.remove(reg)
+        # Virtual registers get their live intervals from the emitted text in
+        # _assign_registers; kept so call sites still mark where values die.
+        return
 
-    def handle_array_print(self, expression):
+    def handle_array_print(self, expression, current_class=None, param_map=None, local_var_offsets=None):
 
-        array_reg = self.generate_expression(expression)  
+        array_reg = self.generate_expression(expression, current_class, param_map, local_var_offsets)
         length_reg = self.allocate_register()
 
-        self.text_section.append(f"lw {length_reg}, 0({array_reg})  # Load array length")
+        self.emit(f"lw {length_reg}, 0({array_reg})  # Load array length")
 
         loop_label = f"print_array_loop_{self.label_counter}"
         end_label = f"print_array_end_{self.label_counter}"
         self.label_counter += 1
 
-        self.text_section.append(f"li $t0, 0  # Initialize index to 0")
-        self.text_section.append(f"{loop_label}:")
-        self.text_section.append(f"bge $t0, {length_reg}, {end_label}  # Exit loop if index >= length")
-
-        self.text_section.append(f"mul $t1, $t0, 4  # Calculate offset")
-        self.text_section.append(f"addiu $t1, $t1, 4  # Skip length field")
-        self.text_section.append(f"add $t1, $t1, {array_reg}  # Compute address of arr[index]")
-        self.text_section.append(f"lw $a0, 0($t1)  # Load array element")
-        self.text_section.append("li $v0, 1  # Print integer syscall")
-        self.text_section.append("syscall")
+        cursor_reg = self.allocate_register()
+        end_reg = self.allocate_register()
+
+        # Pointer-walk loop: the cursor runs from the first element to one
+        # past the last, so the body needs no index arithmetic and only one
+        # branch per iteration
+        self.text_section.write(
+            f"addiu {cursor_reg}, {array_reg}, 4  # Point cursor at first element\n"
+            f"sll {end_reg}, {length_reg}, 2  # Length in bytes\n"
+            f"add {end_reg}, {cursor_reg}, {end_reg}  # One past the last element\n"
+            f"beq {cursor_reg}, {end_reg}, {end_label}  # Skip loop for empty arrays\n"
+            f"{loop_label}:\n"
+            f"lw $a0, 0({cursor_reg})  # Load array element\n"
+            "li $v0, 1  # Print integer syscall\n"
+            "syscall\n"
+            f"addiu {cursor_reg}, {cursor_reg}, 4  # Advance cursor\n"
+            f"bne {cursor_reg}, {end_reg}, {loop_label}  # Continue until the end\n"
+            f"{end_label}:\n"
+        )
+        self._ident_cache.clear()  # the inline loop labels end the block
 
-        self.text_section.append("addi $t0, $t0, 1  # Increment index")
-        self.text_section.append(f"j {loop_label}  # Jump to loop start")
-        self.text_section.append(f"{end_label}:")
-        
         self.free_register(array_reg)
         self.free_register(length_reg)
+        self.free_register(cursor_reg)
+        self.free_register(end_reg)
 
     def generate_assignment(self, node, current_class=None, param_map=None, local_var_offsets=None):
         logging.debug("Generating Assignment command.")
@@ -231,16 +743,17 @@ class MiniJavaCodeGenerator:
         target = node["target"]
         if target in local_var_offsets:
             offset = local_var_offsets[target]
-            self.text_section.append(f"sw {value_reg}, {offset}($fp)  # Store value in local variable '{target}'")
+            self.emit(f"sw {value_reg}, {offset}($fp)  # Store value in local variable '{target}'")
         elif target in param_map:
             param_location = param_map[target]
             if param_location.startswith("$"): 
-                self.text_section.append(f"move {param_location}, {value_reg}  # Store value in parameter '{target}'")
+                self.emit(f"move {param_location}, {value_reg}  # Store value in parameter '{target}'")
             else:  
-                self.text_section.append(f"sw {value_reg}, {param_location}($fp)  # Store value in parameter '{target}'")
+                self.emit(f"sw {value_reg}, {param_location}($fp)  # Store value in parameter '{target}'")
         else:
             raise CodeGenerationError(f"Unknown target for assignment: {target}", node)
 
+        self._ident_cache.pop(target, None)  # the cached load is now stale
         self.free_register(value_reg)
         
     def generate_if(self, node, current_class=None, param_map=None, local_var_offsets=None):
@@ -252,262 +765,339 @@ class MiniJavaCodeGenerator:
         
         condition_reg = self.generate_expression(node["condition"], current_class, param_map, local_var_offsets)
         
-        self.text_section.append(f"beq {condition_reg}, $zero, {else_label}  # If condition is false, jump to else")
+        self.emit(f"beq {condition_reg}, $zero, {else_label}  # If condition is false, jump to else")
         self.generate_command(node["if_true"], current_class, param_map, local_var_offsets)
-        self.text_section.append(f"j {end_if_label}  # Jump to end of if")
+        self.emit(f"j {end_if_label}  # Jump to end of if")
         
-        self.text_section.append(f"{else_label}:")
+        self.emit(f"{else_label}:")
+        self._ident_cache.clear()  # loads from the taken branch are not valid here
         if "if_false" in node:
             self.generate_command(node["if_false"], current_class, param_map, local_var_offsets)
-        
-        self.text_section.append(f"{end_if_label}:")
+
+        self.emit(f"{end_if_label}:")
+        self._ident_cache.clear()
         
         self.free_register(condition_reg)
         
     def generate_return(self, node, current_class=None, param_map=None, local_var_offsets=None):
         logging.debug("Generating Return command.")
 
-        return_reg = self.generate_expression(node["value"], current_class)
-        
-        self.text_section.append(f"move $v0, {return_reg}  # Move return value to $v0")
+        return_reg = self.generate_expression(node["value"], current_class, param_map, local_var_offsets)
+
+        self.emit(f"move $v0, {return_reg}  # Move return value to $v0")
         
         self.free_register(return_reg)
 
-    def generate_expression(self, node, current_class=None, param_map=None, local_var_offsets=None):
+    def generate_expression(self, node: dict, current_class=None, param_map=None, local_var_offsets=None) -> str:
         logging.debug(f"Generating expression: {node['type']}")
-        
-        if node["type"] == "Number":
+
+        node_type = node["type"]
+
+        # Leaf fast path: literals, 'this' and null make up most visits, so
+        # handle them inline before touching the dispatch table
+        if node_type == "Number":
             reg = self.allocate_register()
-            self.text_section.append(f"li {reg}, {node['value']}  # Load immediate {node['value']}")
+            self.emit(f"li {reg}, {node['value']}  # Load immediate {node['value']}")
             return reg
-        elif node["type"] == "Boolean":
+        if node_type == "Boolean":
             reg = self.allocate_register()
             value = 1 if node["value"] == "true" else 0
-            self.text_section.append(f"li {reg}, {value}  # Load boolean value {'true' if value == 1 else 'false'}")
+            self.emit(f"li {reg}, {value}  # Load boolean value {'true' if value == 1 else 'false'}")
             return reg
-        elif node["type"] == "LogicalOp":
-            left_reg = self.generate_expression(node["left"], current_class, param_map=None, local_var_offsets=None)
-            right_reg = self.generate_expression(node["right"], current_class, param_map=None, local_var_offsets=None)
+        if node_type == "This":
             reg = self.allocate_register()
-            if node["operator"] == "&&":
-                self.text_section.append(f"and {reg}, {left_reg}, {right_reg}  # Logical AND")
-            else:
-                raise CodeGenerationError(f"Unsupported logical operator: {node['operator']}")
-            self.free_register(left_reg)
-            self.free_register(right_reg)
+            self.emit(f"move {reg}, $a0  # Load 'this' (current object)")
             return reg
-        elif node["type"] == "Identifier":
-            var_name = node["name"]
-            if var_name in param_map:  
-                reg = self.allocate_register()
-                if param_map[var_name].startswith("$"): 
-                    self.text_section.append(f"move {reg}, {param_map[var_name]}  # Load parameter '{var_name}'")
-                else: 
-                    self.text_section.append(f"lw {reg}, {param_map[var_name]}($fp)  # Load parameter '{var_name}' from stack")
-            elif var_name in local_var_offsets: 
-                reg = self.allocate_register()
-                self.text_section.append(f"lw {reg}, {local_var_offsets[var_name]}($fp)  # Load local variable '{var_name}'")
+        if node_type == "Null":
+            return "$zero"  # null is always 0; $zero already holds it, no load needed
+
+        handler = self._EXPR_HANDLERS.get(node_type)
+        if handler is None:
+            raise CodeGenerationError(f"Unsupported expression type: {node_type}")
+        return handler(self, node, current_class, param_map, local_var_offsets)
+
+    def _gen_number(self, node, current_class, param_map, local_var_offsets):
+        reg = self.allocate_register()
+        self.emit(f"li {reg}, {node['value']}  # Load immediate {node['value']}")
+        return reg
+
+    def _gen_boolean(self, node, current_class, param_map, local_var_offsets):
+        reg = self.allocate_register()
+        value = 1 if node["value"] == "true" else 0
+        self.emit(f"li {reg}, {value}  # Load boolean value {'true' if value == 1 else 'false'}")
+        return reg
+
+    def _gen_logical(self, node, current_class, param_map, local_var_offsets):
+        left_reg, right_reg = self._eval_binary_operands(node, current_class, param_map, local_var_offsets)
+        reg = self.allocate_register()
+        if node["operator"] == "&&":
+            self.emit(f"and {reg}, {left_reg}, {right_reg}  # Logical AND")
+        else:
+            raise CodeGenerationError(f"Unsupported logical operator: {node['operator']}")
+        self.free_register(left_reg)
+        self.free_register(right_reg)
+        return reg
+
+    def _gen_identifier(self, node, current_class, param_map, local_var_offsets):
+        var_name = node["name"]
+        cached = self._ident_cache.get(var_name)
+        if cached is not None:
+            return cached  # value already materialized in this basic block
+        if var_name in param_map:
+            reg = self.allocate_register()
+            if param_map[var_name].startswith("$"):
+                self.emit(f"move {reg}, {param_map[var_name]}  # Load parameter '{var_name}'")
             else:
-                raise CodeGenerationError(f"Unknown variable: {var_name}", node)
-            return reg
-        elif node["type"] == "NewObject":
-            class_name = node["class_name"]
-            if class_name not in self.symbol_table:
-                raise CodeGenerationError(f"Class '{class_name}' is not defined.", node)
-
-            object_size = 0
-            current_class = self.symbol_table.get(class_name)
-            while current_class:
-                object_size += len(current_class["fields"]) * 4
-                parent_class = current_class.get("parent")
-                current_class = self.symbol_table.get(parent_class)
-
-            self.text_section.append("li $v0, 9  # Syscall for sbrk (memory allocation)")
-            self.text_section.append(f"li $a0, {object_size}  # Set allocation size")
-            self.text_section.append("syscall")
-            
-            object_reg = self.allocate_register()
-            self.text_section.append(f"move {object_reg}, $v0  # Store allocated address for the object")
+                self.emit(f"lw {reg}, {param_map[var_name]}($fp)  # Load parameter '{var_name}' from stack")
+        elif var_name in local_var_offsets:
+            reg = self.allocate_register()
+            self.emit(f"lw {reg}, {local_var_offsets[var_name]}($fp)  # Load local variable '{var_name}'")
+        else:
+            raise CodeGenerationError(f"Unknown variable: {var_name}", node)
+        self._ident_cache[var_name] = reg
+        return reg
 
-            for offset in range(0, object_size, 4):
-                self.text_section.append(f"sw $zero, {offset}({object_reg})  # Initialize field at offset {offset} to 0")
+    def _gen_new_object(self, node, current_class, param_map, local_var_offsets):
+        class_name = node["class_name"]
+        if class_name not in self.symbol_table:
+            raise CodeGenerationError(f"Class '{class_name}' is not defined.", node)
 
-            return object_reg
-        elif node["type"] == "FieldAccess":
-            object_reg = self.generate_expression(node["target"], current_class) 
-            class_name = node["target"]["class_name"] 
-            field_name = node["field_name"]
+        object_size = self._object_size[class_name]
+
+        self.emit("li $v0, 9  # Syscall for sbrk (memory allocation)")
+        self.emit(f"li $a0, {object_size}  # Set allocation size")
+        self.emit("syscall")
+
+        object_reg = self.allocate_register()
+        self.emit(f"move {object_reg}, $v0  # Store allocated address for the object")
+
+        if object_size <= 32:
+            # Small objects: unrolled stores, built as one string so the
+            # whole block is a single buffer write
+            self.text_section.write(
+                "".join(f"sw $zero, {offset}({object_reg})  # Initialize field at offset {offset} to 0\n"
+                        for offset in range(0, object_size, 4))
+            )
+        elif object_size > 0:
+            # Large objects: a memset-style loop keeps the emitted text O(1)
+            # in the field count instead of one store per field
+            self.label_counter += 1
+            loop_label = f"zero_fields_{self.label_counter}"
+            cursor_reg = self.allocate_register()
+            end_reg = self.allocate_register()
+            self.text_section.write(
+                f"move {cursor_reg}, {object_reg}  # Point cursor at first field\n"
+                f"addiu {end_reg}, {object_reg}, {object_size}  # One past the last field\n"
+                f"{loop_label}:\n"
+                f"sw $zero, 0({cursor_reg})  # Initialize field to 0\n"
+                f"addiu {cursor_reg}, {cursor_reg}, 4  # Advance cursor\n"
+                f"bne {cursor_reg}, {end_reg}, {loop_label}  # Continue until the end\n"
+            )
+            self._ident_cache.clear()  # the inline loop label ends the block
+            self.free_register(cursor_reg)
+            self.free_register(end_reg)
+
+        return object_reg
+
+    def _gen_field_access(self, node, current_class, param_map, local_var_offsets):
+        object_reg = self.generate_expression(node["target"], current_class, param_map, local_var_offsets)
+        class_name = node["target"]["class_name"]
+        field_name = node["field_name"]
 
-            field_offset = self.resolve_field_offset(class_name, field_name)
+        field_offset = self.resolve_field_offset(class_name, field_name)
 
-            field_reg = self.allocate_register()
-            self.text_section.append(f"lw {field_reg}, {field_offset}({object_reg})  # Load field '{field_name}'")
+        field_reg = self.allocate_register()
+        self.emit(f"lw {field_reg}, {field_offset}({object_reg})  # Load field '{field_name}'")
 
-            self.free_register(object_reg)
-            return field_reg
-        elif node["type"] == "ArithmeticOp":
-            left_reg = self.generate_expression(node["left"], current_class, param_map, local_var_offsets)
-            right_reg = self.generate_expression(node["right"], current_class, param_map, local_var_offsets)
-            reg = self.allocate_register()
-            operator = {
-                "+": "add",
-                "-": "sub",
-                "*": "mul"
-            }.get(node["operator"], None)
-            if not operator:
-                raise CodeGenerationError(f"Unsupported operator: {node['operator']}")
-            self.text_section.append(f"{operator} {reg}, {left_reg}, {right_reg}")
-            self.free_register(left_reg)
-            self.free_register(right_reg)
-            return reg
-        elif node["type"] == "ArrayInstantiation":
-            size_reg = self.generate_expression(node["size"], current_class)  
-            
-            self.text_section.append(f"mul {size_reg}, {size_reg}, 4  # Multiply size by 4 (word size)")
-            self.text_section.append(f"addiu {size_reg}, {size_reg}, 4  # Add 4 bytes for the length")
-            
-            self.text_section.append("li $v0, 9  # Syscall for sbrk (memory allocation)")
-            self.text_section.append(f"move $a0, {size_reg}  # Set allocation size")
-            self.text_section.append("syscall")
-            
-            array_reg = self.allocate_register()
-            self.text_section.append(f"move {array_reg}, $v0  # Store allocated address")
-            
-            self.text_section.append(f"sw {size_reg}, 0({array_reg})  # Store array length at the beginning")
-            
-            self.free_register(size_reg)  
-            return array_reg
-        elif node["type"] == "ArrayAccess":
-            array_reg = self.generate_expression(node["array"], current_class)  
-            index_reg = self.generate_expression(node["index"], current_class) 
-            
-            self.text_section.append(f"mul {index_reg}, {index_reg}, 4  # Multiply index by 4")
-            self.text_section.append(f"addiu {index_reg}, {index_reg}, 4  # Add 4 to skip the length field")
-            self.text_section.append(f"add {index_reg}, {array_reg}, {index_reg}  # Compute the final address")
-            
-            value_reg = self.allocate_register()
-            self.text_section.append(f"lw {value_reg}, 0({index_reg})  # Load value from array[index]")
-            
-            self.free_register(array_reg)
-            self.free_register(index_reg)
-            return value_reg
-        elif node["type"] == "ArrayAssignment":
-            array_reg = self.generate_expression(node["array"], current_class, param_map, local_var_offsets)  
-            index_reg = self.generate_expression(node["index"], current_class, param_map, local_var_offsets) 
-            value_reg = self.generate_expression(node["value"], current_class, param_map, local_var_offsets)  
-            
-            self.text_section.append(f"mul {index_reg}, {index_reg}, 4  # Multiply index by 4")
-            self.text_section.append(f"addiu {index_reg}, {index_reg}, 4  # Add 4 to skip the length field")
-            self.text_section.append(f"add {index_reg}, {array_reg}, {index_reg}  # Compute the final address")
-            
-            self.text_section.append(f"sw {value_reg}, 0({index_reg})  # Store value into array[index]")
-            
-            self.free_register(array_reg)
-            self.free_register(index_reg)
-            self.free_register(value_reg)
-        elif node["type"] == "ArrayLength":
-            array_reg = self.generate_expression(node["array"])  
-            
-            length_reg = self.allocate_register()
-            self.text_section.append(f"lw {length_reg}, 0({array_reg})  # Load array length")
-            
-            self.free_register(array_reg)
-            return length_reg
-        elif node["type"] == "RelationalOp":
-            left_reg = self.generate_expression(node["left"], current_class, param_map, local_var_offsets)
-            right_reg = self.generate_expression(node["right"], current_class, param_map, local_var_offsets)
-            result_reg = self.allocate_register()
-
-            operator = node["operator"]
-            if operator == "<":
-                self.text_section.append(f"slt {result_reg}, {left_reg}, {right_reg}  # Less than")
-            elif operator == "<=":
-                self.text_section.append(f"sle {result_reg}, {left_reg}, {right_reg}  # Less than or equal")
-            elif operator == ">":
-                self.text_section.append(f"sgt {result_reg}, {left_reg}, {right_reg}  # Greater than")
-            elif operator == ">=":
-                self.text_section.append(f"sge {result_reg}, {left_reg}, {right_reg}  # Greater than or equal")
-            elif operator == "==":
-                self.text_section.append(f"seq {result_reg}, {left_reg}, {right_reg}  # Equal")
-            elif operator == "!=":
-                self.text_section.append(f"sne {result_reg}, {left_reg}, {right_reg}  # Not equal")
-            else:
-                raise CodeGenerationError(f"Unsupported relational operator: {operator}", node)
+        self.free_register(object_reg)
+        return field_reg
+
+    def _gen_arith(self, node, current_class, param_map, local_var_offsets):
+        left_reg, right_reg = self._eval_binary_operands(node, current_class, param_map, local_var_offsets)
+        reg = self.allocate_register()
+        operator = self._ARITH_OPS.get(node["operator"])
+        if not operator:
+            raise CodeGenerationError(f"Unsupported operator: {node['operator']}")
+        self.emit(f"{operator} {reg}, {left_reg}, {right_reg}")
+        self.free_register(left_reg)
+        self.free_register(right_reg)
+        return reg
+
+    def _gen_array_instantiation(self, node, current_class, param_map, local_var_offsets):
+        size_reg = self.generate_expression(node["size"], current_class, param_map, local_var_offsets)
+
+        # O tamanho em bytes vai para um registrador novo: size_reg pode ser
+        # uma entrada viva do _ident_cache e não deve ser alterado no lugar
+        byte_reg = self.allocate_register()
+        self.emit(f"mul {byte_reg}, {size_reg}, 4  # Multiply size by 4 (word size)")
+        self.emit(f"addiu {byte_reg}, {byte_reg}, 4  # Add 4 bytes for the length")
+
+        self.emit("li $v0, 9  # Syscall for sbrk (memory allocation)")
+        self.emit(f"move $a0, {byte_reg}  # Set allocation size")
+        self.emit("syscall")
+
+        array_reg = self.allocate_register()
+        self.emit(f"move {array_reg}, $v0  # Store allocated address")
+
+        self.emit(f"sw {byte_reg}, 0({array_reg})  # Store array length at the beginning")
+
+        self.free_register(size_reg)
+        self.free_register(byte_reg)
+        return array_reg
+
+    def _gen_array_access(self, node, current_class, param_map, local_var_offsets):
+        array_reg = self.generate_expression(node["array"], current_class, param_map, local_var_offsets)
+        index_reg = self.generate_expression(node["index"], current_class, param_map, local_var_offsets)
+
+        # O endereço é calculado em um registrador novo: index_reg pode ser
+        # uma entrada viva do _ident_cache (ex.: o 'i' de 'i + b[i]') e uma
+        # expressão externa ainda pode estar lendo esse registrador
+        addr_reg = self.allocate_register()
+        self.emit(f"mul {addr_reg}, {index_reg}, 4  # Multiply index by 4")
+        self.emit(f"addiu {addr_reg}, {addr_reg}, 4  # Add 4 to skip the length field")
+        self.emit(f"add {addr_reg}, {array_reg}, {addr_reg}  # Compute the final address")
+
+        value_reg = self.allocate_register()
+        self.emit(f"lw {value_reg}, 0({addr_reg})  # Load value from array[index]")
 
-            self.free_register(left_reg)
-            self.free_register(right_reg)
-            
-            return result_reg
-        elif node["type"] == "This":
-            reg = self.allocate_register()
-            self.text_section.append(f"move {reg}, $a0  # Load 'this' (current object)")
-            return reg
-        elif node["type"] == "MethodCall":
-            if node["target"]["type"] == "This":
-                if not current_class:
-                    raise CodeGenerationError("Cannot resolve 'this' without a current class context.", node)
-                object_reg = self.allocate_register()
-                self.text_section.append(f"move {object_reg}, $a0  # Load 'this' (current object)")
-
-                if isinstance(current_class, dict):
-                    target_class = next(
-                        (class_name for class_name, class_data in self.symbol_table.items() if class_data == current_class), 
-                        None
-                    )
-                else:
-                    target_class = current_class
-
-                if not target_class or not isinstance(target_class, str):
-                    raise CodeGenerationError("Failed to resolve the class name for 'this'.", node)
-            elif node["target"]["type"] == "NewObject":
-                object_reg = self.generate_expression(node["target"], current_class)  
-                target_class = node["target"]["class_name"]  
-                if isinstance(target_class, dict):  
-                    target_class = target_class.get("name")
-            else:
-                object_reg = self.generate_expression(node["target"], current_class)
-                target_class = node["target"].get("class_name")  
-                if isinstance(target_class, dict): 
-                    target_class = target_class.get("name")
-                    
-            if target_class not in self.symbol_table:
-                raise CodeGenerationError(f"Class '{target_class}' is not defined.", node)
+        self.free_register(array_reg)
+        self.free_register(index_reg)
+        self.free_register(addr_reg)
+        return value_reg
 
-            method_name = node["method_name"]
-            if method_name not in self.symbol_table[target_class]["methods"]:
-                raise CodeGenerationError(f"Method '{method_name}' not found in class '{target_class}'.", node)
+    def _gen_array_assignment(self, node, current_class, param_map, local_var_offsets):
+        array_reg = self.generate_expression(node["array"], current_class, param_map, local_var_offsets)
+        index_reg = self.generate_expression(node["index"], current_class, param_map, local_var_offsets)
+        value_reg = self.generate_expression(node["value"], current_class, param_map, local_var_offsets)
 
-            arguments = node["arguments"]
-            if arguments["type"] == "ExpressionList":
-                arguments = arguments["expressions"]
+        # mesmo cuidado do acesso: o endereço vai para um registrador novo
+        # para não sobrescrever um index_reg cacheado
+        addr_reg = self.allocate_register()
+        self.emit(f"mul {addr_reg}, {index_reg}, 4  # Multiply index by 4")
+        self.emit(f"addiu {addr_reg}, {addr_reg}, 4  # Add 4 to skip the length field")
+        self.emit(f"add {addr_reg}, {array_reg}, {addr_reg}  # Compute the final address")
 
-            arg_regs = []
-            for arg_node in arguments:
-                arg_reg = self.generate_expression(arg_node, current_class, param_map, local_var_offsets)
-                arg_regs.append(arg_reg)
+        self.emit(f"sw {value_reg}, 0({addr_reg})  # Store value into array[index]")
 
-            for i, arg_reg in enumerate(arg_regs):
-                self.text_section.append(f"move $a{i}, {arg_reg}  # Pass argument {i}")
+        self.free_register(array_reg)
+        self.free_register(index_reg)
+        self.free_register(addr_reg)
+        self.free_register(value_reg)
+
+    def _gen_array_length(self, node, current_class, param_map, local_var_offsets):
+        array_reg = self.generate_expression(node["array"], current_class, param_map, local_var_offsets)
+
+        length_reg = self.allocate_register()
+        self.emit(f"lw {length_reg}, 0({array_reg})  # Load array length")
 
-            self.text_section.append(f"jal {target_class}_{method_name}  # Call method '{method_name}'")
+        self.free_register(array_reg)
+        return length_reg
+
+    def _gen_rel(self, node, current_class, param_map, local_var_offsets):
+        left_reg, right_reg = self._eval_binary_operands(node, current_class, param_map, local_var_offsets)
+        result_reg = self.allocate_register()
+
+        op_entry = self._REL_OPS.get(node["operator"])
+        if op_entry is None:
+            raise CodeGenerationError(f"Unsupported relational operator: {node['operator']}", node)
+        opcode, comment = op_entry
+        self.emit(f"{opcode} {result_reg}, {left_reg}, {right_reg}  # {comment}")
+
+        self.free_register(left_reg)
+        self.free_register(right_reg)
+
+        return result_reg
+
+    def _gen_this(self, node, current_class, param_map, local_var_offsets):
+        reg = self.allocate_register()
+        self.emit(f"move {reg}, $a0  # Load 'this' (current object)")
+        return reg
+
+    def _gen_method_call(self, node, current_class, param_map, local_var_offsets):
+        label = node.get("_label")
+        if label is not None:
+            # Fast path: target class/method were resolved by the pre-pass,
+            # so skip symbol-table validation entirely.
+            object_reg = self.generate_expression(node["target"], current_class, param_map, local_var_offsets)
+        elif node["target"]["type"] == "This":
+            if not current_class:
+                raise CodeGenerationError("Cannot resolve 'this' without a current class context.", node)
+            object_reg = self.allocate_register()
+            self.emit(f"move {object_reg}, $a0  # Load 'this' (current object)")
 
-            for arg_reg in arg_regs:
+            if isinstance(current_class, dict):
+                target_class = self._class_name_by_data.get(id(current_class))
+            else:
+                target_class = current_class
+
+            if not target_class or not isinstance(target_class, str):
+                raise CodeGenerationError("Failed to resolve the class name for 'this'.", node)
+        elif node["target"]["type"] == "NewObject":
+            object_reg = self.generate_expression(node["target"], current_class, param_map, local_var_offsets)
+            target_class = node["target"]["class_name"]
+            if isinstance(target_class, dict):
+                target_class = target_class.get("name")
+        else:
+            object_reg = self.generate_expression(node["target"], current_class, param_map, local_var_offsets)
+            target_class = node["target"].get("class_name")
+            if isinstance(target_class, dict):
+                target_class = target_class.get("name")
+
+        method_name = node["method_name"]
+        if label is None:
+            if target_class not in self._classes:
+                raise CodeGenerationError(f"Class '{target_class}' is not defined.", node)
+
+            if method_name not in self._methods[target_class]:
+                raise CodeGenerationError(f"Method '{method_name}' not found in class '{target_class}'.", node)
+
+            label = f"{target_class}_{method_name}"
+
+        arguments = node["arguments"]
+        if arguments["type"] == "ExpressionList":
+            arguments = arguments["expressions"]
+
+        expected_arity = node.get("_arity")
+        if expected_arity is not None and len(arguments) != expected_arity:
+            raise CodeGenerationError(
+                f"Method '{method_name}' expects {expected_arity} argument(s), "
+                f"but {len(arguments)} were provided.", node)
+
+        arg_regs = []
+        for idx, arg_node in enumerate(arguments):
+            arg_reg = self.generate_expression(arg_node, current_class, param_map, local_var_offsets)
+            if any(self._contains_call(later) for later in arguments[idx + 1:]):
+                # A later argument performs a call; park this one on the stack
+                self.emit("addiu $sp, $sp, -4  # Push argument across call")
+                self.emit(f"sw {arg_reg}, 0($sp)  # Preserve argument {idx}")
                 self.free_register(arg_reg)
-            self.free_register(object_reg)
+                arg_reg = None
+            arg_regs.append(arg_reg)
+        for idx in range(len(arg_regs) - 1, -1, -1):
+            if arg_regs[idx] is None:  # pop in reverse push order
+                reg = self.allocate_register()
+                self.emit(f"lw {reg}, 0($sp)  # Restore argument {idx}")
+                self.emit("addiu $sp, $sp, 4  # Pop argument")
+                arg_regs[idx] = reg
 
-            result_reg = self.allocate_register()
-            self.text_section.append(f"move {result_reg}, $v0  # Store return value")
-            return result_reg
+        self.text_section.write(
+            "".join(f"move $a{i}, {arg_reg}  # Pass argument {i}\n" for i, arg_reg in enumerate(arg_regs))
+        )
 
+        self.emit(f"jal {label}  # Call method '{method_name}'")
+        self._ident_cache.clear()  # the callee clobbers caller-saved registers
 
+        for arg_reg in arg_regs:
+            self.free_register(arg_reg)
+        self.free_register(object_reg)
+
+        result_reg = self.allocate_register()
+        self.emit(f"move {result_reg}, $v0  # Store return value")
+        return result_reg
+
+    def _gen_null(self, node, current_class, param_map, local_var_offsets):
+        return "$zero"  # null is always 0; $zero already holds it, no load needed
 
-        elif node["type"] == "Null":
-            reg = self.allocate_register()
-            self.text_section.append(f"li {reg}, 0  # Load null value (0)")
-            return reg
-        else:
-            raise CodeGenerationError(f"Unsupported expression type: {node['type']}")
-        
     def generate_while(self, node, current_class=None, param_map=None, local_var_offsets=None):
         logging.debug("Generating While command.")
         
@@ -515,21 +1105,23 @@ class MiniJavaCodeGenerator:
         start_label = f"while_start_{self.label_counter}"
         end_label = f"while_end_{self.label_counter}"
         
-        self.text_section.append(f"{start_label}:")
-        
-        condition_reg = self.generate_expression(node["condition"], current_class)
-        
-        self.text_section.append(f"beq {condition_reg}, $zero, {end_label}  # If condition is false, exit loop")
+        self.emit(f"{start_label}:")
+        self._ident_cache.clear()  # the back edge re-enters here
+
+        condition_reg = self.generate_expression(node["condition"], current_class, param_map, local_var_offsets)
+
+        self.emit(f"beq {condition_reg}, $zero, {end_label}  # If condition is false, exit loop")
         
         self.generate_command(node["body"], current_class, param_map, local_var_offsets)
         
-        self.text_section.append(f"j {start_label}  # Repeat loop")
-        
-        self.text_section.append(f"{end_label}:")
+        self.emit(f"j {start_label}  # Repeat loop")
+
+        self.emit(f"{end_label}:")
+        self._ident_cache.clear()
         
         self.free_register(condition_reg)
 
-    def generate_field_assignment(self, node, current_class=None):
+    def generate_field_assignment(self, node, current_class=None, param_map=None, local_var_offsets=None):
         object_reg = self.generate_expression(node["target"], current_class, param_map, local_var_offsets)
         class_name = node["target"]["class_name"]
         field_name = node["field_name"]
@@ -540,27 +1132,55 @@ class MiniJavaCodeGenerator:
         if field_name not in self.symbol_table[class_name]["fields"]:
             raise CodeGenerationError(f"Field '{field_name}' not found in class '{class_name}'.", node)
 
-        field_offset = list(self.symbol_table[class_name]["fields"].keys()).index(field_name) * 4
+        field_offset = self._flat_field_offsets[class_name][field_name]
 
-        self.text_section.append(f"sw {value_reg}, {field_offset}({object_reg})  # Store value in field '{field_name}'")
+        self.emit(f"sw {value_reg}, {field_offset}({object_reg})  # Store value in field '{field_name}'")
 
         self.free_register(object_reg)
         self.free_register(value_reg)
 
-    def resolve_field_offset(self, class_name, field_name):
-        current_class = self.symbol_table.get(class_name)
-        offset = 0
-
-        while current_class:
-            if field_name in current_class["fields"]:
-                field_index = list(current_class["fields"].keys()).index(field_name)
-                return offset + (field_index * 4)
-            else:
-                offset += len(current_class["fields"]) * 4
-                parent_class = current_class.get("parent")
-                current_class = self.symbol_table.get(parent_class)
+    def resolve_field_offset(self, class_name: str, field_name: str) -> int:
+        try:
+            return self._flat_field_offsets[class_name][field_name]
+        except KeyError:
+            raise CodeGenerationError(f"Field '{field_name}' not found in class hierarchy of '{class_name}'.")
+
+    def generate_block(self, node, current_class=None, param_map=None, local_var_offsets=None):
+        for command in node["commands"]:
+            self.generate_command(command, current_class, param_map, local_var_offsets)
+
+    def generate_noop(self, node, current_class=None, param_map=None, local_var_offsets=None):
+        pass  # pruned constant branch
+
+    # Dispatch tables: one dict lookup instead of walking an elif chain on
+    # every node visit. Defined last so the method objects already exist.
+    _CMD_HANDLERS = {
+        "Print": generate_print,
+        "Assignment": generate_assignment,
+        "If": generate_if,
+        "While": generate_while,
+        "Return": generate_return,
+        "Block": generate_block,
+        "NoOp": generate_noop,
+    }
 
-        raise CodeGenerationError(f"Field '{field_name}' not found in class hierarchy of '{class_name}'.")
+    _EXPR_HANDLERS = {
+        "Number": _gen_number,
+        "Boolean": _gen_boolean,
+        "LogicalOp": _gen_logical,
+        "Identifier": _gen_identifier,
+        "NewObject": _gen_new_object,
+        "FieldAccess": _gen_field_access,
+        "ArithmeticOp": _gen_arith,
+        "ArrayInstantiation": _gen_array_instantiation,
+        "ArrayAccess": _gen_array_access,
+        "ArrayAssignment": _gen_array_assignment,
+        "ArrayLength": _gen_array_length,
+        "RelationalOp": _gen_rel,
+        "This": _gen_this,
+        "MethodCall": _gen_method_call,
+        "Null": _gen_null,
+    }
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG, format='%(levelname)s: %(message)s')
@@ -598,9 +1218,8 @@ if __name__ == "__main__":
 
     generator = MiniJavaCodeGenerator(syntax_tree, symbol_table)
     try:
-        mips_code = generator.generate()
-        with open("output.asm", "w") as f:
-            f.write(mips_code)
+        with open("output.asm", "w", buffering=1 << 20) as f:
+            generator.generate(out=f)
         print("MIPS code generated successfully.")
 
     except CodeGenerationError as e:
@@ -1,46 +1,132 @@
 from minijava_scanner import MiniJavaScanner
 import json
+import sys
 
 class ParserError(Exception):
     pass
 
+# Conjuntos de dispatch usados nos laços de parse; construídos uma vez no
+# nível do módulo em vez de a cada chamada
+_PRIMITIVE_TYPES = frozenset({"int", "boolean"})
+_BOOL_LITERALS = frozenset({"true", "false"})
+
+# Folhas compartilhadas (flyweights): a árvore é somente-leitura depois do
+# parse, então cada 'this', 'null', 'true' e 'false' aponta para o mesmo nó
+_THIS = {"type": "This"}
+_NULL = {"type": "NullLiteral"}
+_TRUE = {"type": "BooleanLiteral", "value": True}
+_FALSE = {"type": "BooleanLiteral", "value": False}
+
+# Tabelas da escalada de precedência: nível e tipo de nó de cada operador
+# binário (associatividade à esquerda em todos os níveis)
+_PRECEDENCE = {"&&": 1, "<": 2, "==": 2, "!=": 2, "+": 3, "-": 3, "*": 4}
+
+def _make_binary_builder(node_type, operator):
+    # Construtor pré-ligado por operador: o tipo de nó e o operador já vêm
+    # fechados na função, restando uma chamada posicional por nó criado
+    def build(left, right):
+        return {"type": node_type, "operator": operator, "left": left, "right": right}
+    return build
+
+_BINARY_BUILDERS = {
+    op: _make_binary_builder(node_type, op)
+    for op, node_type in (
+        ("<", "RelationalOp"), ("==", "RelationalOp"), ("!=", "RelationalOp"),
+        ("+", "ArithmeticOp"), ("-", "ArithmeticOp"), ("*", "ArithmeticOp"),
+    )
+}
+_BINARY_BUILDERS["&&"] = lambda left, right: {"type": "LogicalAnd", "left": left, "right": right}
+
 def print_syntax_tree(node, prefix="", is_last=True):
+    # Acumula as linhas e faz uma única escrita em stdout, em vez de um
+    # print (lock + flush) por nó
+    out = []
+    segments = [prefix] if prefix else []
+    _format_syntax_tree(node, segments, is_last, out)
+    sys.stdout.write("".join(out))
+
+def _format_syntax_tree(node, segments, is_last, out):
+    # O prefixo desce como lista de segmentos (append na descida, pop na
+    # volta); a string só é montada no ponto de emissão, evitando uma
+    # concatenação O(profundidade) por chamada recursiva
     connector = "└── " if is_last else "├── "
     if isinstance(node, dict):
         node_type = node.get("type", "Unknown")
-        print(f"{prefix}{connector}{node_type}")
-        prefix += "    " if is_last else "│   "
+        out.append(f"{''.join(segments)}{connector}{node_type}\n")
+        segments.append("    " if is_last else "│   ")
+        prefix = "".join(segments)
         keys = [k for k in node.keys() if k != "type"]
         for i, key in enumerate(keys):
             is_last_key = i == len(keys) - 1
-            print(f"{prefix}{'└── ' if is_last_key else '├── '}{key}:")
-            print_syntax_tree(node[key], prefix + ("    " if is_last_key else "│   "), is_last_key)
+            out.append(f"{prefix}{'└── ' if is_last_key else '├── '}{key}:\n")
+            segments.append("    " if is_last_key else "│   ")
+            _format_syntax_tree(node[key], segments, is_last_key, out)
+            segments.pop()
+        segments.pop()
     elif isinstance(node, list):
+        last = len(node) - 1
         for i, item in enumerate(node):
-            is_last_item = i == len(node) - 1
-            print_syntax_tree(item, prefix, is_last_item)
+            _format_syntax_tree(item, segments, i == last, out)
     else:
-        print(f"{prefix}{connector}{node}")
+        out.append(f"{''.join(segments)}{connector}{node}\n")
 
 
 class MiniJavaParserLL1:
-    def __init__(self, tokens):
+    # A AST continua sendo dict por nó: a análise semântica e o gerador de
+    # código percorrem a árvore com isinstance(node, dict) e indexação por
+    # chave. O layout fixo fica nas instâncias do parser, cujos atributos
+    # quentes (tokens, current_index) viram acesso por offset.
+    __slots__ = ("tokens", "current_index", "_memo")
+
+    def __init__(self, tokens: list, memoize: bool = False) -> None:
+        # O scanner já encerra a lista com ("EOF", ""); listas montadas sem
+        # o sentinela ganham um aqui para manter current_token sem checagem
+        if not tokens or tokens[-1][0] != "EOF":
+            tokens = tokens + [("EOF", "")]
         self.tokens = tokens
         self.current_index = 0
+        # Packrat opcional: (regra, índice inicial) -> (nó, índice final).
+        # A gramática é LL(1), então o cache só paga quando a mesma faixa de
+        # tokens é parseada mais de uma vez; desligado por padrão.
+        self._memo = {} if memoize else None
+
+    # Anotações nos caminhos quentes para compilação AOT (Cython/mypyc)
+    def current_token(self) -> tuple:
+        # O sentinela EOF garante que o índice é sempre válido
+        return self.tokens[self.current_index]
+
+    def consume(self, expected_type: str | None = None, expected_value: str | None = None) -> tuple:
+        # Caminho quente: só leituras locais e comparações; a montagem das
+        # mensagens de erro fica nos helpers, chamados apenas em caso de falha
+        index = self.current_index
+        token = self.tokens[index]
+        if expected_type is not None and token[0] != expected_type:
+            self._type_mismatch(token, expected_type)
+        if expected_value is not None and token[1] != expected_value:
+            self._value_mismatch(token, expected_value)
+        self.current_index = index + 1
+        return token
 
-    def current_token(self):
-        return self.tokens[self.current_index] if self.current_index < len(self.tokens) else None
+    def _unexpected_eof(self, expected_type, expected_value):
+        raise ParserError(f"Unexpected end of input, expected {expected_type or expected_value}")
 
-    def consume(self, expected_type=None, expected_value=None):
-        token = self.current_token()
-        if not token:
-            raise ParserError(f"Unexpected end of input, expected {expected_type or expected_value}")
-        if expected_type and token[0] != expected_type:
-            raise ParserError(f"Expected token type {expected_type}, but got {token[0]} : {token[1]}")
-        if expected_value and token[1] != expected_value:
-            raise ParserError(f"Expected token value '{expected_value}', but got '{token[1]}'")
-        self.current_index += 1
-        return token
+    def _type_mismatch(self, token, expected_type):
+        if token[0] == "EOF":
+            self._unexpected_eof(expected_type, None)
+        raise ParserError(f"Expected token type {expected_type}, but got {token[0]} : {token[1]}"
+                          + self._position_of(token))
+
+    def _value_mismatch(self, token, expected_value):
+        if token[0] == "EOF":
+            self._unexpected_eof(None, expected_value)
+        raise ParserError(f"Expected token value '{expected_value}', but got '{token[1]}'"
+                          + self._position_of(token))
+
+    @staticmethod
+    def _position_of(token):
+        # Tokens do scanner carregam a posição no terceiro campo; listas
+        # montadas à mão com pares (tipo, lexema) continuam aceitas
+        return f" at position {token[2]}" if len(token) > 2 else ""
 
     def parse_program(self):
         """
@@ -48,7 +134,7 @@ class MiniJavaParserLL1:
         """
         main_class = self.parse_main()
         classes = []
-        while self.current_token():
+        while self.current_token()[0] != "EOF":
             classes.append(self.parse_class())
         return {"type": "Program", "main_class": main_class, "classes": classes}
 
@@ -87,11 +173,13 @@ class MiniJavaParserLL1:
         parameters.append({"type": "Parameter", "param_type": param_type, "name": param_name})
 
         # Parâmetros adicionais, separados por vírgula
-        while self.current_token() and self.current_token()[1] == ",":
+        tok = self.current_token()
+        while tok and tok[1] == ",":
             self.consume("PUNCTUATION", ",")
             param_type = self.parse_type()
             param_name = self.consume("IDENTIFIER")[1]
             parameters.append({"type": "Parameter", "param_type": param_type, "name": param_name})
+            tok = self.current_token()
 
         return parameters
 
@@ -103,14 +191,15 @@ class MiniJavaParserLL1:
         self.consume("RESERVED", "class")
         class_name = self.consume("IDENTIFIER")[1]
         parent_name = None
-        if self.current_token() and self.current_token()[1] == "extends":
+        tok = self.current_token()
+        if tok and tok[1] == "extends":
             self.consume("RESERVED", "extends")
             parent_name = self.consume("IDENTIFIER")[1]
         self.consume("PUNCTUATION", "{")
         variables = []
         methods = []
-        while self.current_token() and self.current_token()[1] not in {"}"}:
-            if self.current_token()[1] == "public":
+        while (tok := self.current_token())[1] != "}":
+            if tok[1] == "public":
                 methods.append(self.parse_method())
             else:
                 variables.append(self.parse_variable())
@@ -124,13 +213,14 @@ class MiniJavaParserLL1:
         token = self.consume("RESERVED")
         
         # Tipo `int[]`
-        if token[1] == "int" and self.current_token() and self.current_token()[1] == "[":
+        tok = self.current_token()
+        if token[1] == "int" and tok and tok[1] == "[":
             self.consume("PUNCTUATION", "[")
             self.consume("PUNCTUATION", "]")
             return "int[]"
 
         # Tipos `int` ou `boolean`
-        if token[1] in {"int", "boolean"}:
+        if token[1] in _PRIMITIVE_TYPES:
             return token[1]
 
         # Tipo como identificador (nome de classe)
@@ -157,13 +247,14 @@ class MiniJavaParserLL1:
         return_type = self.parse_type()
         method_name = self.consume("IDENTIFIER")[1]
         self.consume("PUNCTUATION", "(")
-        parameters = self.parse_params() if self.current_token() and self.current_token()[0] != "PUNCTUATION" else []
+        tok = self.current_token()
+        parameters = self.parse_params() if tok and tok[0] != "PUNCTUATION" else []
         self.consume("PUNCTUATION", ")")
         self.consume("PUNCTUATION", "{")
         local_variables = []
         commands = []
-        while self.current_token() and self.current_token()[1] != "return":
-            if self.current_token()[0] == "RESERVED" and self.current_token()[1] in {"int", "boolean"}:
+        while (tok := self.current_token())[1] != "return":
+            if tok[0] == "RESERVED" and tok[1] in _PRIMITIVE_TYPES:
                 local_variables.append(self.parse_variable())
             else:
                 commands.append(self.parse_command())
@@ -186,7 +277,7 @@ class MiniJavaParserLL1:
         CMD -> {CMD}
         """
         commands = []
-        while self.current_token() and self.current_token()[1] != "}":
+        while self.current_token()[1] != "}":
             commands.append(self.parse_command())
         return commands
 
@@ -225,7 +316,8 @@ class MiniJavaParserLL1:
             self.consume("PUNCTUATION", ")")
             if_true = self.parse_command()
             if_false = None
-            if self.current_token() and self.current_token()[1] == "else":
+            tok = self.current_token()
+            if tok and tok[1] == "else":
                 self.consume("RESERVED", "else")
                 if_false = self.parse_command()
             return {"type": "If", "condition": condition, "if_true": if_true, "if_false": if_false}
@@ -242,14 +334,15 @@ class MiniJavaParserLL1:
         # Atribuição: id = EXP ;
         elif token[0] == "IDENTIFIER":
             identifier = self.consume("IDENTIFIER")[1]
-            if self.current_token() and self.current_token()[1] == "=":
+            tok = self.current_token()
+            if tok and tok[1] == "=":
                 self.consume("OPERATOR", "=")
                 value = self.parse_expression()
                 self.consume("PUNCTUATION", ";")
                 return {"type": "Assignment", "target": identifier, "value": value}
 
             # Atribuição de array: id '[' EXP ']' = EXP ;
-            elif self.current_token() and self.current_token()[1] == "[":
+            elif tok and tok[1] == "[":
                 self.consume("PUNCTUATION", "[")
                 index = self.parse_expression()
                 self.consume("PUNCTUATION", "]")
@@ -262,47 +355,46 @@ class MiniJavaParserLL1:
 
     def parse_expression(self):
         """
-        EXP -> REXP {&& REXP}
-        """
-        left = self.parse_rexp()
-        while self.current_token() and self.current_token()[1] == "&&":
-            self.consume("OPERATOR", "&&")
-            right = self.parse_rexp()
-            left = {"type": "LogicalAnd", "left": left, "right": right}
-        return left
-
-    def parse_rexp(self):
-        """
+        EXP  -> REXP {&& REXP}
         REXP -> AEXP {(< | == | !=) AEXP}
-        """
-        left = self.parse_aexp()
-        while self.current_token() and self.current_token()[1] in {"<", "==", "!="}:
-            operator = self.consume("OPERATOR")[1]
-            right = self.parse_aexp()
-            left = {"type": "RelationalOp", "operator": operator, "left": left, "right": right}
-        return left
-
-    def parse_aexp(self):
-        """
         AEXP -> MEXP {(+ | -) MEXP}
-        """
-        left = self.parse_mexp()
-        while self.current_token() and self.current_token()[1] in {"+", "-"}:
-            operator = self.consume("OPERATOR")[1]
-            right = self.parse_mexp()
-            left = {"type": "ArithmeticOp", "operator": operator, "left": left, "right": right}
-        return left
-
-    def parse_mexp(self):
-        """
         MEXP -> SEXP {* SEXP}
-        """
-        left = self.parse_sexp()
-        while self.current_token() and self.current_token()[1] == "*":
-            self.consume("OPERATOR", "*")
-            right = self.parse_sexp()
-            left = {"type": "ArithmeticOp", "operator": "*", "left": left, "right": right}
-        return left
+
+        A cascata inteira é parseada por escalada de precedência: um único
+        método com a tabela _PRECEDENCE em vez de um quadro Python por nível.
+        """
+        if self._memo is not None:
+            return self._memoized("expression", self._parse_expression)
+        return self._parse_expression()
+
+    def _memoized(self, rule, fn):
+        key = (rule, self.current_index)
+        hit = self._memo.get(key)
+        if hit is not None:
+            self.current_index = hit[1]
+            return hit[0]
+        result = fn()
+        self._memo[key] = (result, self.current_index)
+        return result
+
+    def _parse_expression(self):
+        # Shunting-yard: pilhas explícitas de operandos e operadores em um
+        # único laço, sem um quadro Python recursivo por nível de precedência
+        operands = [self.parse_sexp()]
+        operators = []  # pares (operador, precedência) pendentes
+        while (prec := _PRECEDENCE.get(self.current_token()[1], 0)):
+            # associatividade à esquerda: reduz tudo com precedência >= atual
+            while operators and operators[-1][1] >= prec:
+                operator, _ = operators.pop()
+                right = operands.pop()
+                operands[-1] = _BINARY_BUILDERS[operator](operands[-1], right)
+            operators.append((self.consume("OPERATOR")[1], prec))
+            operands.append(self.parse_sexp())
+        while operators:
+            operator, _ = operators.pop()
+            right = operands.pop()
+            operands[-1] = _BINARY_BUILDERS[operator](operands[-1], right)
+        return operands[0]
 
     def parse_sexp(self):
         """
@@ -311,9 +403,9 @@ class MiniJavaParserLL1:
         token = self.current_token()
 
         # true | false
-        if token[1] in {"true", "false"}:
+        if token[1] in _BOOL_LITERALS:
             self.consume("RESERVED")
-            return {"type": "BooleanLiteral", "value": token[1] == "true"}
+            return _TRUE if token[1] == "true" else _FALSE
 
         # num
         elif token[0] == "NUMBER":
@@ -323,7 +415,7 @@ class MiniJavaParserLL1:
         # null
         elif token[1] == "null":
             self.consume("RESERVED", "null")
-            return {"type": "NullLiteral"}
+            return _NULL
 
         # new int '[' EXP ']'
         elif token[1] == "new" and self.tokens[self.current_index + 1][1] == "int":
@@ -349,6 +441,11 @@ class MiniJavaParserLL1:
         """
         PEXP -> id | this | new id '(' ')' | '(' EXP ')' | PEXP . id | PEXP . id '(' [EXPS] ')' | PEXP '[' EXP ']'
         """
+        if self._memo is not None:
+            return self._memoized("pexp", self._parse_pexp)
+        return self._parse_pexp()
+
+    def _parse_pexp(self):
         token = self.current_token()
 
         # id
@@ -359,7 +456,7 @@ class MiniJavaParserLL1:
         # this
         elif token[1] == "this":
             self.consume("RESERVED", "this")
-            left = {"type": "This"}
+            left = _THIS
 
         # new id '(' ')'
         elif token[1] == "new":
@@ -378,49 +475,60 @@ class MiniJavaParserLL1:
         else:
             raise ParserError(f"Unexpected token in primary expression: {token}")
 
-        # Processar extensões de PEXP
-        while self.current_token() and self.current_token()[1] in {".", "["}:
-            if self.current_token()[1] == ".":
-                # PEXP . id
-                self.consume("PUNCTUATION", ".")
-                method_or_field = self.consume("IDENTIFIER")[1]
-                if self.current_token() and self.current_token()[1] == "(":
-                    # PEXP . id '(' [EXPS] ')'
-                    self.consume("PUNCTUATION", "(")
-                    arguments = []
-                    if self.current_token()[1] != ")":
-                        arguments = self.parse_exps()
-                    self.consume("PUNCTUATION", ")")
-                    left = {
-                        "type": "MethodCall",
-                        "target": left,
-                        "method_name": method_or_field,
-                        "arguments": arguments,
-                    }
-                else:
-                    left = {
-                        "type": "FieldAccess",
-                        "target": left,
-                        "field_name": method_or_field,
-                    }
-
-            elif self.current_token()[1] == "[":
-                # PEXP '[' EXP ']'
-                self.consume("PUNCTUATION", "[")
-                index = self.parse_expression()
-                self.consume("PUNCTUATION", "]")
-                left = {"type": "ArrayAccess", "array": left, "index": index}
+        # Processar extensões de PEXP: uma busca na tabela de dispatch por
+        # token em vez de cadeia de if/elif
+        while True:
+            handler = self._PEXP_EXT.get(self.current_token()[1])
+            if handler is None:
+                break
+            left = handler(self, left)
 
         return left
 
+    def _pexp_dot(self, left):
+        # PEXP . id | PEXP . id '(' [EXPS] ')'
+        self.consume("PUNCTUATION", ".")
+        method_or_field = self.consume("IDENTIFIER")[1]
+        tok = self.current_token()
+        if tok and tok[1] == "(":
+            self.consume("PUNCTUATION", "(")
+            arguments = []
+            if self.current_token()[1] != ")":
+                arguments = self.parse_exps()
+            self.consume("PUNCTUATION", ")")
+            return {
+                "type": "MethodCall",
+                "target": left,
+                "method_name": method_or_field,
+                "arguments": arguments,
+            }
+        return {
+            "type": "FieldAccess",
+            "target": left,
+            "field_name": method_or_field,
+        }
+
+    def _pexp_index(self, left):
+        # PEXP '[' EXP ']'
+        self.consume("PUNCTUATION", "[")
+        index = self.parse_expression()
+        self.consume("PUNCTUATION", "]")
+        return {"type": "ArrayAccess", "array": left, "index": index}
+
+    # Tabela de dispatch das extensões de PEXP; definida após os métodos,
+    # como as tabelas de handlers do gerador de código
+    _PEXP_EXT = {".": _pexp_dot, "[": _pexp_index}
+
     def parse_exps(self):
         """
         EXPS -> EXP {, EXP}
         """
         expressions = [self.parse_expression()]
-        while self.current_token() and self.current_token()[1] == ",":
+        tok = self.current_token()
+        while tok and tok[1] == ",":
             self.consume("PUNCTUATION", ",")
             expressions.append(self.parse_expression())
+            tok = self.current_token()
         return {"type": "ExpressionList", "expressions": expressions}
     
 # Execução do Parser
@@ -447,8 +555,11 @@ if __name__ == "__main__":
     parser = MiniJavaParserLL1(tokens)
     syntax_tree = parser.parse_program()
 
-    formatted_output = json.dumps(syntax_tree, indent=4)
     print("Syntax Tree:")
     print_syntax_tree(syntax_tree)
 
+    # Dump JSON apenas quando pedido, direto no stream (sem string intermediária)
+    if "--json" in sys.argv:
+        json.dump(syntax_tree, sys.stdout, indent=4)
+
 
@@ -1,35 +1,91 @@
 import re
+import sys
+
+# Tokens descartados pelo scanner; frozenset no nível do módulo para que a
+# checagem por token seja uma única busca por hash
+_SKIP = frozenset({"WHITESPACE", "COMMENT"})
+
+# Categorias de vocabulário fixo: os lexemas são internados para que as
+# comparações no parser saiam pelo atalho de identidade de str.__eq__
+# (NUMBER e IDENTIFIER ficam de fora por terem vocabulário ilimitado)
+_INTERN_LEXEME = frozenset({"RESERVED", "PUNCTUATION", "OPERATOR"})
+
+# Palavras reservadas, classificadas por busca em conjunto depois que o
+# identificador casa — uma busca por hash em vez de percorrer as
+# alternativas do regex a cada posição ("System.out.println" é tratada à
+# parte por conter pontos)
+_RESERVED = frozenset({
+    "boolean", "class", "extends", "public", "static", "void", "main",
+    "String", "return", "int", "if", "else", "while", "length", "true",
+    "false", "this", "new", "null",
+})
 
 class MiniJavaScanner:
+    __slots__ = ("token_patterns", "master_pattern")
+
     def __init__(self):
         # Padrões de tokens -- cada padrão é uma tupla (nome, expressão regular)
         self.token_patterns = [
             ("WHITESPACE", r"[ \n\t\r\f]+"),  # Espaços em branco
             ("COMMENT", r"//.*|/\*[\s\S]*?\*/"),  # Comentários
-            ("RESERVED", r"\b(boolean|class|extends|public|static|void|main|String|return|int|if|else|while|System\.out\.println|length|true|false|this|new|null)\b"),  # Palavras reservadas
-            ("IDENTIFIER", r"\b[a-zA-Z][a-zA-Z0-9_]*\b"),  # Identificadores
+            ("IDENTIFIER", r"\b[a-zA-Z][a-zA-Z0-9_]*\b"),  # Identificadores e palavras reservadas
             ("NUMBER", r"\b\d+\b"),  # Numerais
             ("OPERATOR", r"<=|>=|==|!=|<|>|\+|-|\*|&&|!|="),  # Operadores
             ("PUNCTUATION", r"[()\[\]{},.;]"),  # Pontuação
         ]
-        # Compilar os padrões
-        self.compiled_patterns = [(name, re.compile(pattern)) for name, pattern in self.token_patterns]
+        # Um único regex mestre com grupos nomeados: o laço interno roda no
+        # motor re (em C) em vez de tentar cada padrão por posição em Python
+        self.master_pattern = re.compile(
+            "|".join(f"(?P<{name}>{pattern})" for name, pattern in self.token_patterns)
+        )
 
-    def tokenize(self, code):
-        tokens = []
+    def tokenize(self, code: str) -> list:
+        # Lista pré-dimensionada pela heurística de ~1 token a cada 3 bytes:
+        # escrever por índice evita as realocações geométricas do append
+        capacity = max(16, len(code) // 3)
+        tokens = [None] * capacity
+        count = 0
         position = 0
-        while position < len(code):
-            match = None
-            for token_name, pattern in self.compiled_patterns:
-                match = pattern.match(code, position)
-                if match:
-                    lexeme = match.group(0)
-                    if token_name != "WHITESPACE" and token_name != "COMMENT":
-                        tokens.append((token_name, lexeme))
-                    position = match.end()
-                    break
-            if not match:
+        # finditer mantém a iteração por token dentro do motor re (em C);
+        # lacunas entre casamentos denunciam caracteres inválidos
+        for match in self.master_pattern.finditer(code):
+            start = match.start()
+            if start < position:
+                continue  # trecho já consumido pela fusão de token
+            if start > position:
                 raise SyntaxError(f"Unexpected character: {code[position]} at position {position}")
+            position = match.end()
+            # lastgroup devolve sempre o mesmo objeto str por grupo, então o
+            # campo de tipo já é um id canônico comparável por identidade
+            token_name = match.lastgroup
+            if token_name in _SKIP:
+                continue
+            lexeme = match.group()
+            if token_name == "IDENTIFIER":
+                # 'System' seguido de '.out.println' funde em um único token
+                if lexeme == "System" and code.startswith(".out.println", position):
+                    position += 12
+                    if count == capacity:
+                        tokens.extend([None] * capacity)
+                        capacity *= 2
+                    tokens[count] = ("RESERVED", "System.out.println", start)
+                    count += 1
+                    continue
+                if lexeme in _RESERVED:
+                    token_name = "RESERVED"
+            if token_name in _INTERN_LEXEME:
+                lexeme = sys.intern(lexeme)
+            if count == capacity:
+                tokens.extend([None] * capacity)
+                capacity *= 2
+            tokens[count] = (token_name, lexeme, start)
+            count += 1
+        if position < len(code):
+            raise SyntaxError(f"Unexpected character: {code[position]} at position {position}")
+        # Sentinela de fim de entrada: o parser lê tokens por índice sem
+        # checagem de limite
+        del tokens[count:]
+        tokens.append(("EOF", "", len(code)))
         return tokens
 
 # Exemplo de uso
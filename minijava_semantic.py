@@ -1,48 +1,112 @@
+import operator
+import sys
+from collections import ChainMap, deque
+
 from minijava_scanner import MiniJavaScanner
 from minijava_parser import MiniJavaParserLL1
 import logging
 
+# Nomes usados como chave de dict são internados para que as buscas na
+# tabela de símbolos saiam pelo atalho de identidade de ponteiro (o scanner
+# já interna os lexemas, mas a árvore pode vir de outra fonte, ex.: JSON)
+_intern = sys.intern
+
+# Avaliadores de operador binário para a dobra de constantes: uma busca em
+# dict no lugar da cadeia de elif ('&&' usa lambda para manter a semântica
+# de curto-circuito de 'and')
+_BINOPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "&&": lambda left, right: left and right,
+    "<": operator.lt,
+    ">": operator.gt,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
 class SemanticError(Exception):
     pass
 
+class _MethodSig:
+    # Assinatura achatada de método para o índice (classe, método)
+    __slots__ = ("param_types", "return_type")
+
+    def __init__(self, param_types, return_type):
+        self.param_types = param_types
+        self.return_type = return_type
+
 class MiniJavaSemanticAnalyzer:
+    __slots__ = (
+        "syntax_tree", "symbol_table", "_type_cache",
+        "_method_index", "_field_index", "_resolved",
+    )
+
     def __init__(self, syntax_tree):
         self.syntax_tree = syntax_tree
         self.symbol_table = {}
+        # Cache de tipos por identidade de nó (ver get_expression_type);
+        # recriado a cada método validado
+        self._type_cache = {}
+        # Índices achatados (classe, membro) -> dado, ver _build_indexes
+        self._method_index = {}
+        self._field_index = {}
+        # Classes com herança já resolvida (ver resolve_class_inheritance)
+        self._resolved = set()
 
     def analyze(self):
         self.collect_declarations(self.syntax_tree)
-        
+        self._build_indexes()
+
         logging.info("Symbol Table After First Pass (Declaration Collection):")
         logging.debug(self.symbol_table)
-        
+
         self.validate_program(self.syntax_tree)
         return self.syntax_tree
 
+    def _build_indexes(self):
+        # Índices achatados com chave (classe, membro): a validação de uma
+        # chamada faz uma única busca de hash em vez de quatro dicts
+        # encadeados (symbol_table -> classe -> methods -> método -> campo)
+        self._method_index = {}
+        self._field_index = {}
+        for class_name, data in self.symbol_table.items():
+            for method_name, method_data in data["methods"].items():
+                self._method_index[(class_name, method_name)] = _MethodSig(
+                    method_data["param_types"], method_data["return_type"]
+                )
+            for field_name, field_type in data["fields"].items():
+                self._field_index[(class_name, field_name)] = field_type
+
     def collect_declarations(self, node):
         if node["type"] == "Program":
-            main_class_name = node["main_class"]["class_name"]
+            main_class_name = _intern(node["main_class"]["class_name"])
             if main_class_name not in self.symbol_table:
                 self.symbol_table[main_class_name] = {"fields": {}, "methods": {}, "extends": None}
-            
+
             for clazz in node["classes"]:
-                class_name = clazz["name"]
+                class_name = _intern(clazz["name"])
                 if class_name not in self.symbol_table:
                     self.symbol_table[class_name] = {
                         "fields": {},
                         "methods": {},
-                        "extends": clazz.get("extends")
+                        # o parser emite a superclasse como "parent"
+                        "extends": clazz.get("extends") or clazz.get("parent")
                     }
-                
-                for var in clazz.get("fields", []):
-                    self.symbol_table[class_name]["fields"][var["name"]] = var["var_type"]
-                
+
+                # o parser emite os campos da classe como "variables"
+                for var in clazz.get("fields") or clazz.get("variables", []):
+                    self.symbol_table[class_name]["fields"][_intern(var["name"])] = var["var_type"]
+
                 for method in clazz["methods"]:
-                    method_name = method["name"]
+                    method_name = _intern(method["name"])
                     if method_name in self.symbol_table[class_name]["methods"]:
                         raise SemanticError(f"Duplicate method name '{method_name}' in class '{class_name}'.")
                     self.symbol_table[class_name]["methods"][method_name] = {
-                        "parameters": {param["name"]: param["param_type"] for param in method["parameters"]},
+                        "parameters": {_intern(param["name"]): param["param_type"] for param in method["parameters"]},
+                        # assinatura posicional pré-computada: evita
+                        # reconstruir a view items() a cada chamada validada
+                        "param_types": tuple(param["param_type"] for param in method["parameters"]),
                         "return_type": method["return_type"]
                     }
 
@@ -65,17 +129,24 @@ class MiniJavaSemanticAnalyzer:
             self.validate_method(method, class_name)
 
     def validate_method(self, method, class_name):
-        method_table = {"current_class": class_name}
+        self._type_cache = {}
 
-        for param in method["parameters"]:
-            param_name = param["name"]
-            method_table[param_name] = param["param_type"]
+        # Escopos encadeados: parâmetros viram um mapa construído de uma só
+        # vez e os locais entram no mapa da frente; o ChainMap consulta os
+        # mapas em ordem sem copiar as entradas para um dict único. Os campos
+        # da classe ficam por último, sombreados por locais e parâmetros
+        param_map = {_intern(param["name"]): param["param_type"] for param in method["parameters"]}
+        local_map = {}
+        declared = ChainMap({"current_class": class_name}, local_map, param_map)
+        method_table = ChainMap(*declared.maps, self.symbol_table[class_name]["fields"])
 
         for var in method["local_variables"]:
-            var_name = var["name"]
-            if var_name in method_table:
+            var_name = _intern(var["name"])
+            # duplicata só contra o que o método declara: sombrear um campo
+            # da classe é permitido
+            if var_name in declared:
                 raise SemanticError(f"Duplicate local variable '{var_name}' in method '{method['name']}'.")
-            method_table[var_name] = var["var_type"]
+            local_map[var_name] = var["var_type"]
 
         for command in method["commands"]:
             self.check_command(command, method_table)
@@ -90,92 +161,136 @@ class MiniJavaSemanticAnalyzer:
 
     def check_command(self, node, method_table=None):
         if method_table is None:
-            method_table = {}  
-
-        logging.debug(f"Processing command: {node['type']}")
-
-        if node["type"] == "Assignment":
-            var_name = node["target"]
-            if var_name not in method_table:
-                raise SemanticError(f"Variable '{var_name}' is not declared in the current or outer scope.")
-            self.check_expression(node["value"], method_table)
-
-        elif node["type"] == "If":
-            self.check_expression(node["condition"], method_table)
-            self.check_command(node["if_true"], method_table)
-            if "if_false" in node:
-                self.check_command(node["if_false"], method_table)
-
-        elif node["type"] == "While":
-            self.check_expression(node["condition"], method_table)
-            self.check_command(node["body"], method_table)
-
-        elif node["type"] == "Print":
-            self.check_expression(node["expression"], method_table)
-
-        elif node["type"] == "Return":
-            self.check_expression(node["value"], method_table)
-
-        elif node["type"] == "Block":
-            for command in node["commands"]:
-                self.check_command(command, method_table)
-
-        elif node["type"] == "MethodCall":
-            logging.debug(f"Validating method call: {node['method_name']} with arguments {node['arguments']}")
-            self.validate_method_call(node, method_table)
-
-        else:
-            raise SemanticError(f"Unsupported command type: {node['type']}")
-
-        if "expression" in node and node["type"] != "Print": 
-            node["expression"] = self.simplify_expression(node["expression"])
+            method_table = {}
+
+        # Pilha explícita no lugar da recursão: comandos aninhados (If, While,
+        # Block) são empilhados e drenados aqui, sem um frame Python por nó e
+        # sem risco de estourar o limite de recursão em programas profundos
+        stack = deque([node])
+        # buscas quentes presas em locais: evita o LOAD_ATTR + busca em dict
+        # por nó visitado no laço de drenagem
+        pop = stack.pop
+        get_handler = self._CMD_HANDLERS.get
+        while stack:
+            command = pop()
+            command_type = command["type"]
+            logging.debug(f"Processing command: {command_type}")
+
+            handler = get_handler(command_type)
+            if handler is None:
+                raise SemanticError(f"Unsupported command type: {command_type}")
+            handler(self, command, method_table, stack)
+
+    def _cmd_assignment(self, node, method_table, stack):
+        var_name = node["target"]
+        if var_name not in method_table:
+            raise SemanticError(f"Variable '{var_name}' is not declared in the current or outer scope.")
+        self.check_expression(node["value"], method_table)
+
+    def _cmd_if(self, node, method_table, stack):
+        self.check_expression(node["condition"], method_table)
+        # empilhado em ordem inversa para que o pop visite na ordem do fonte
+        if "if_false" in node:
+            stack.append(node["if_false"])
+        stack.append(node["if_true"])
+
+    def _cmd_while(self, node, method_table, stack):
+        self.check_expression(node["condition"], method_table)
+        stack.append(node["body"])
+
+    def _cmd_print(self, node, method_table, stack):
+        self.check_expression(node["expression"], method_table)
+
+    def _cmd_return(self, node, method_table, stack):
+        self.check_expression(node["value"], method_table)
+
+    def _cmd_block(self, node, method_table, stack):
+        stack.extend(reversed(node["commands"]))
+
+    def _cmd_method_call(self, node, method_table, stack):
+        logging.debug(f"Validating method call: {node['method_name']} with arguments {node['arguments']}")
+        self.validate_method_call(node, method_table)
 
     def check_expression(self, expression, method_table):
-        if expression["type"] == "MethodCall":
-            self.validate_method_call(expression, method_table)
-
-        elif expression["type"] in ["ArithmeticOp", "RelationalOp", "LogicalOp"]:
-            self.check_expression(expression["left"], method_table)
-            self.check_expression(expression["right"], method_table)
-
-        elif expression["type"] == "UnaryOp":
-            self.check_expression(expression["operand"], method_table)
-
-        elif expression["type"] == "Identifier":
-            if expression["name"] not in method_table:
-                raise SemanticError(f"Variable '{expression['name']}' is not declared.")
-
-        elif expression["type"] == "Number":
-            pass
-
-        elif expression["type"] == "Boolean":
-            pass
-
-        elif expression["type"] == "NewObject":
-            class_name = expression["class_name"]
-            if class_name not in self.symbol_table:
-                raise SemanticError(f"Class '{class_name}' is not defined.")
-
-        elif expression["type"] == "This":
-            if "current_class" not in method_table:
-                raise SemanticError("'this' cannot be used outside a class context.")
-
-        elif expression["type"] == "ArrayAccess":
-            self.check_expression(expression["array"], method_table)
-            self.check_expression(expression["index"], method_table)
-
-        elif expression["type"] == "ArrayLength":
-            self.check_expression(expression["array"], method_table)
-
-        elif expression["type"] == "ArrayInstantiation":
-            self.check_expression(expression["size"], method_table)
-
-        elif expression["type"] == "ExpressionList":
-            for expr in expression["expressions"]:
-                self.check_expression(expr, method_table)
+        # Mesmo esquema iterativo dos comandos: subexpressões vão para a pilha
+        # e cada nó é despachado por uma busca em dict em vez da cadeia de elif
+        stack = deque([expression])
+        pop = stack.pop
+        get_handler = self._EXPR_HANDLERS.get
+        while stack:
+            expr = pop()
+            handler = get_handler(expr["type"])
+            if handler is None:
+                raise SemanticError(f"Unsupported expression type: {expr['type']}")
+            handler(self, expr, method_table, stack)
+
+    def _expr_method_call(self, expression, method_table, stack):
+        self.validate_method_call(expression, method_table)
+
+    def _expr_binary(self, expression, method_table, stack):
+        stack.append(expression["right"])
+        stack.append(expression["left"])
+
+    def _expr_unary(self, expression, method_table, stack):
+        stack.append(expression["operand"])
+
+    def _expr_identifier(self, expression, method_table, stack):
+        if expression["name"] not in method_table:
+            raise SemanticError(f"Variable '{expression['name']}' is not declared.")
+
+    def _expr_leaf(self, expression, method_table, stack):
+        pass
+
+    def _expr_new_object(self, expression, method_table, stack):
+        class_name = expression["class_name"]
+        if class_name not in self.symbol_table:
+            raise SemanticError(f"Class '{class_name}' is not defined.")
+
+    def _expr_this(self, expression, method_table, stack):
+        if "current_class" not in method_table:
+            raise SemanticError("'this' cannot be used outside a class context.")
+
+    def _expr_array_access(self, expression, method_table, stack):
+        stack.append(expression["index"])
+        stack.append(expression["array"])
+
+    def _expr_array_length(self, expression, method_table, stack):
+        stack.append(expression["array"])
+
+    def _expr_array_instantiation(self, expression, method_table, stack):
+        stack.append(expression["size"])
+
+    def _expr_expression_list(self, expression, method_table, stack):
+        stack.extend(reversed(expression["expressions"]))
+
+    # Tabelas de despacho por tipo de nó (métodos não-vinculados, no mesmo
+    # padrão de _CMD_HANDLERS/_EXPR_HANDLERS do gerador de código)
+    _CMD_HANDLERS = {
+        "Assignment": _cmd_assignment,
+        "If": _cmd_if,
+        "While": _cmd_while,
+        "Print": _cmd_print,
+        "Return": _cmd_return,
+        "Block": _cmd_block,
+        "MethodCall": _cmd_method_call,
+    }
 
-        else:
-            raise SemanticError(f"Unsupported expression type: {expression['type']}")
+    _EXPR_HANDLERS = {
+        "MethodCall": _expr_method_call,
+        "ArithmeticOp": _expr_binary,
+        "RelationalOp": _expr_binary,
+        "LogicalOp": _expr_binary,
+        "UnaryOp": _expr_unary,
+        "Identifier": _expr_identifier,
+        "Number": _expr_leaf,
+        "Boolean": _expr_leaf,
+        "NewObject": _expr_new_object,
+        "This": _expr_this,
+        "ArrayAccess": _expr_array_access,
+        "ArrayLength": _expr_array_length,
+        "ArrayInstantiation": _expr_array_instantiation,
+        "ExpressionList": _expr_expression_list,
+    }
 
     def validate_method_call(self, node, method_table):
         target = node["target"]
@@ -193,21 +308,21 @@ class MiniJavaSemanticAnalyzer:
         logging.info(f"Symbol Table Entry for Class '{class_name}':")
         logging.debug(self.symbol_table.get(class_name, "Class not found"))
 
-        if class_name not in self.symbol_table:
-            raise SemanticError(f"Class '{class_name}' not found.")
-
-        if method_name not in self.symbol_table[class_name]["methods"]:
+        sig = self._method_index.get((class_name, method_name))
+        if sig is None:
+            if class_name not in self.symbol_table:
+                raise SemanticError(f"Class '{class_name}' not found.")
             raise SemanticError(f"Method '{method_name}' not found in class '{class_name}'.")
 
-        expected_parameters = self.symbol_table[class_name]["methods"][method_name]["parameters"]
+        param_types = sig.param_types
 
-        if len(arguments) != len(expected_parameters):
+        if len(arguments) != len(param_types):
             raise SemanticError(
-                f"Method '{method_name}' expects {len(expected_parameters)} arguments, "
+                f"Method '{method_name}' expects {len(param_types)} arguments, "
                 f"but {len(arguments)} were provided."
             )
 
-        for i, (arg, (param_name, param_type)) in enumerate(zip(arguments, expected_parameters.items())):
+        for i, (arg, param_type) in enumerate(zip(arguments, param_types)):
             arg_type = self.get_expression_type(arg, method_table)
             if arg_type != param_type:
                 raise SemanticError(
@@ -216,16 +331,28 @@ class MiniJavaSemanticAnalyzer:
                 )
 
     def get_expression_type(self, expr, method_table):
+        # Memoização por identidade: a árvore não é mutada durante a checagem
+        # de tipos, então id(nó) é uma chave estável dentro de um método —
+        # subárvores revisitadas (ex.: argumentos aninhados) custam uma busca
+        key = (id(expr), id(method_table))
+        cached = self._type_cache.get(key)
+        if cached is not None:
+            return cached
+        expr_type = self._compute_expression_type(expr, method_table)
+        self._type_cache[key] = expr_type
+        return expr_type
+
+    def _compute_expression_type(self, expr, method_table):
         if expr["type"] == "Constant":
             return "int"  
         elif expr["type"] == "Variable":
+            # o escopo do método já encadeia os campos da classe, então uma
+            # única busca cobre locais, parâmetros e campos (o fallback
+            # antigo referenciava um class_name inexistente neste escopo)
             var_name = expr["name"]
             if var_name in method_table:
                 return method_table[var_name]
-            elif var_name in self.symbol_table[class_name]["fields"]:
-                return self.symbol_table[class_name]["fields"][var_name]
-            else:
-                raise SemanticError(f"Variable '{var_name}' is not declared.")
+            raise SemanticError(f"Variable '{var_name}' is not declared.")
         elif expr["type"] == "BinaryOperation":
             left_type = self.get_expression_type(expr["left"], method_table)
             right_type = self.get_expression_type(expr["right"], method_table)
@@ -236,10 +363,10 @@ class MiniJavaSemanticAnalyzer:
         elif expr["type"] == "FunctionCall":
             class_name = expr["target_class"]
             method_name = expr["method"]
-            if class_name in self.symbol_table and method_name in self.symbol_table[class_name]["methods"]:
-                return self.symbol_table[class_name]["methods"][method_name].get("return_type", "void")
-            else:
+            sig = self._method_index.get((class_name, method_name))
+            if sig is None:
                 raise SemanticError(f"Method '{method_name}' not found in class '{class_name}'.")
+            return sig.return_type
         elif expr["type"] == "Number":
             return "int"
         elif expr["type"] == "Identifier":
@@ -259,51 +386,46 @@ class MiniJavaSemanticAnalyzer:
             raise SemanticError(f"Unsupported expression type: {expr['type']}")
 
     def simplify_expression(self, expr):
-        if expr["type"] == "BinaryOperation":
-            left = self.simplify_expression(expr["left"])
-            right = self.simplify_expression(expr["right"])
-
-            if left["type"] == "Constant" and right["type"] == "Constant":
-                value = self.evaluate_binary_operation(left["value"], right["value"], expr["operator"])
-                return {"type": "Constant", "value": value}
-
-            return {
-                "type": "BinaryOperation",
-                "left": left,
-                "right": right,
-                "operator": expr["operator"],
-            }
-        elif expr["type"] == "Constant":
-            return expr  
-        else:
-            return expr  
-        
+        if expr["type"] != "BinaryOperation":
+            return expr
+
+        left = self.simplify_expression(expr["left"])
+        right = self.simplify_expression(expr["right"])
+
+        if left["type"] == "Constant" and right["type"] == "Constant":
+            value = self.evaluate_binary_operation(left["value"], right["value"], expr["operator"])
+            return {"type": "Constant", "value": value}
+
+        # Compartilhamento estrutural: se nenhum filho dobrou, devolve o nó
+        # original em vez de alocar uma cópia idêntica
+        if left is expr["left"] and right is expr["right"]:
+            return expr
+
+        return {
+            "type": "BinaryOperation",
+            "left": left,
+            "right": right,
+            "operator": expr["operator"],
+        }
+
     def evaluate_binary_operation(self, left, right, operator):
-        if operator == "+":
-            return left + right
-        elif operator == "-":
-            return left - right
-        elif operator == "*":
-            return left * right
-        elif operator == "&&":
-            return left and right
-        elif operator == "<":
-            return left < right
-        elif operator == ">":
-            return left > right
-        elif operator == "==":
-            return left == right
-        elif operator == "!=":
-            return left != right
-        else:
+        evaluate = _BINOPS.get(operator)
+        if evaluate is None:
             raise SemanticError(f"Unsupported operator '{operator}'")
+        return evaluate(left, right)
         
     def resolve_inheritance(self):
         for class_name in self.symbol_table:
             logging.info(f"Resolving inheritance for class '{class_name}'")
             self.resolve_class_inheritance(class_name, set())
+        # membros herdados precisam aparecer nos índices achatados
+        self._build_indexes()
 
     def resolve_class_inheritance(self, class_name, visited):
+        # memoização: a cadeia de um pai compartilhado é percorrida e
+        # mesclada uma única vez, não uma vez por subclasse
+        if class_name in self._resolved:
+            return
         if class_name in visited:
             raise SemanticError(f"Cyclic inheritance detected in class '{class_name}'.")
         visited.add(class_name)
@@ -328,6 +450,8 @@ class MiniJavaSemanticAnalyzer:
                 else:
                     self.check_method_override(class_name, method, method_data, child["methods"][method])
 
+        self._resolved.add(class_name)
+
     def check_method_override(self, class_name, method_name, parent_method, child_method):
         if parent_method["return_type"] != child_method["return_type"]:
             raise SemanticError(
@@ -1,20 +1,29 @@
-import struct
+import array
+import re
+import sys
 
+# Regex pré-compilados para o caminho quente de tokenização: vírgulas e
+# espaços caem em uma única chamada C, sem strip() por operando
+_TOKEN_RE = re.compile(r"[,\s]+")
+_OFFSET_RE = re.compile(r"(-?\d+)\(([^)]+)\)")
+
+# Tabelas com valores inteiros: cada campo é deslocado e combinado com OR
+# direto na palavra de 32 bits, sem montar strings de '0'/'1' por instrução
 OPCODES = {
-    "add": "000000", "sub": "000000", "and": "000000", "or": "000000", "slt": "000000",
-    "lw": "100011", "sw": "101011", "addi": "001000", "beq": "000100", "bne": "000101",
-    "j": "000010", "jal": "000011", "mul": "011100", "syscall": "000000", "addiu": "001001", "jr": "000000"
+    "add": 0b000000, "sub": 0b000000, "and": 0b000000, "or": 0b000000, "slt": 0b000000,
+    "lw": 0b100011, "sw": 0b101011, "addi": 0b001000, "beq": 0b000100, "bne": 0b000101,
+    "j": 0b000010, "jal": 0b000011, "mul": 0b011100, "syscall": 0b000000, "addiu": 0b001001, "jr": 0b000000
 }
 
 FUNCT_CODES = {
-    "add": "100000", "sub": "100010", "and": "100100", "or": "100101",
-    "slt": "101010", "jr": "001000", "mul": "000010"
+    "add": 0b100000, "sub": 0b100010, "and": 0b100100, "or": 0b100101,
+    "slt": 0b101010, "jr": 0b001000, "mul": 0b000010
 }
 
 REGISTER_MAP = {
-    "$zero": "00000", "$t0": "01000", "$t1": "01001", "$t2": "01010", "$t3": "01011",
-    "$s0": "10000", "$s1": "10001", "$s2": "10010", "$s3": "10011", "$a0": "00100",
-    "$v0": "00010", "$ra": "11111", "$sp": "00100" , "$fp": "11110"
+    "$zero": 0b00000, "$t0": 0b01000, "$t1": 0b01001, "$t2": 0b01010, "$t3": 0b01011,
+    "$s0": 0b10000, "$s1": 0b10001, "$s2": 0b10010, "$s3": 0b10011, "$a0": 0b00100,
+    "$v0": 0b00010, "$ra": 0b11111, "$sp": 0b00100, "$fp": 0b11110
 }
 
 LABELS = {}
@@ -23,10 +32,8 @@ IN_DATA_SECTION = False
 ADDRESS_COUNTER = 0
 
 def parse_register(reg):
-    reg = reg.strip(",") 
     if reg not in REGISTER_MAP:
         raise ValueError(f"Unsupported register: {reg}")
-    print(f"Register: {reg}, Binary: {REGISTER_MAP[reg]}")
     return REGISTER_MAP[reg]
 
 
@@ -38,31 +45,29 @@ def parse_immediate(imm, bits=16):
 
     if val < -2**(bits-1) or val >= 2**(bits-1):
         raise ValueError(f"Immediate value {val} out of range for {bits}-bit representation.")
-    return format(val & ((1 << bits) - 1), f"0{bits}b") 
+    return val & ((1 << bits) - 1)
 
 def parse_address(addr):
-    return format(int(addr), "026b")
+    return int(addr) & 0x3FFFFFF
 
 def parse_offset(offset_reg):
-    offset, reg = offset_reg.split("(")
-    reg = reg.strip(")")
-    return parse_immediate(offset), parse_register(reg)
+    match = _OFFSET_RE.match(offset_reg)
+    if match is None:
+        raise ValueError(f"Invalid offset operand: {offset_reg}")
+    return parse_immediate(match.group(1)), parse_register(match.group(2))
 
 def r_type_to_binary(instr, rs, rt, rd):
-    opcode = OPCODES[instr]
-    rs_bin = parse_register(rs)
-    rt_bin = parse_register(rt) if rt else "00000"
-    rd_bin = parse_register(rd) if rd else "00000"
-    shamt = "00000"
-    funct = FUNCT_CODES[instr]
-    return f"{opcode}{rs_bin}{rt_bin}{rd_bin}{shamt}{funct}"
+    rs_val = parse_register(rs)
+    rt_val = parse_register(rt) if rt else 0
+    rd_val = parse_register(rd) if rd else 0
+    return (OPCODES[instr] << 26) | (rs_val << 21) | (rt_val << 16) | (rd_val << 11) | FUNCT_CODES[instr]
 
 
 def i_type_to_binary(instr, rs, rt, imm):
-    return f"{OPCODES[instr]}{parse_register(rs)}{parse_register(rt)}{parse_immediate(imm)}"
+    return (OPCODES[instr] << 26) | (parse_register(rs) << 21) | (parse_register(rt) << 16) | parse_immediate(imm)
 
 def j_type_to_binary(instr, address):
-    return f"{OPCODES[instr]}{parse_address(address)}"
+    return (OPCODES[instr] << 26) | parse_address(address)
 
 def translate_line(line):
     global ADDRESS_COUNTER
@@ -70,7 +75,7 @@ def translate_line(line):
     if not line:
         return None
 
-    parts = line.split()
+    parts = _TOKEN_RE.split(line)
     instr = parts[0]
 
     if instr != "syscall" and len(parts) < 2:
@@ -81,7 +86,7 @@ def translate_line(line):
             if instr == "jr": 
                 if len(parts) != 2:
                     raise ValueError(f"R-type instruction '{line}' is missing or has extra operands.")
-                binary = f"{OPCODES[instr]}{parse_register(parts[1])}000000000000000{FUNCT_CODES[instr]}"
+                binary = (OPCODES[instr] << 26) | (parse_register(parts[1]) << 21) | FUNCT_CODES[instr]
             else:
                 if len(parts) < 4:
                     raise ValueError(f"R-type instruction '{line}' is missing operands.")
@@ -91,19 +96,19 @@ def translate_line(line):
                 raise ValueError(f"I-type instruction '{line}' is missing operands.")
             rt = parse_register(parts[1])
             offset, base = parse_offset(parts[2])
-            binary = f"{OPCODES[instr]}{base}{rt}{offset}"
+            binary = (OPCODES[instr] << 26) | (base << 21) | (rt << 16) | offset
         elif instr in {"addi", "addiu", "beq", "bne"}:
             if len(parts) < 4:
                 raise ValueError(f"I-type instruction '{line}' is missing operands.")
             rs = parse_register(parts[2])
             rt = parse_register(parts[1])
-            if instr in {"beq", "bne"}: 
+            if instr in {"beq", "bne"}:
                 label = parts[3]
                 offset = (LABELS[label] - (ADDRESS_COUNTER + 4)) // 4
-                imm = parse_immediate(str(offset), 16)
+                imm = parse_immediate(offset, 16)
             else:
                 imm = parse_immediate(parts[3])
-            binary = f"{OPCODES[instr]}{rs}{rt}{imm}"
+            binary = (OPCODES[instr] << 26) | (rs << 21) | (rt << 16) | imm
         elif instr in {"j", "jal"}: 
             if len(parts) < 2:
                 raise ValueError(f"J-type instruction '{line}' is missing operands.")
@@ -111,7 +116,7 @@ def translate_line(line):
             address = LABELS[label] // 4
             binary = j_type_to_binary(instr, address)
         elif instr == "syscall":
-            binary = "00000000000000000000000000001100"
+            binary = 0x0000000C
         else:
             raise ValueError(f"Unknown instruction: {instr}")
 
@@ -135,81 +140,109 @@ def translate_file(input_file, output_file):
     with open(input_file, "r") as infile, open(output_file, "w") as outfile:
         for line in infile:
             binary = translate_line(line)
-            if binary:
-                outfile.write(binary + "\n")
+            if binary is not None:
+                outfile.write(format(binary, "032b") + "\n")
     
-def pass_one(input_file):
-    global LABELS, DATA_SECTION, IN_DATA_SECTION, ADDRESS_COUNTER
+def assemble(input_file, output_file):
+    # Montador de uma passada: o arquivo é lido uma única vez; referências a
+    # rótulos ainda não definidos emitem uma palavra provisória e entram na
+    # lista de fixups, resolvida ao final com o LABELS completo
+    global ADDRESS_COUNTER, IN_DATA_SECTION
     ADDRESS_COUNTER = 0
     IN_DATA_SECTION = False
 
+    # Uma única leitura do arquivo; as linhas já limpas servem à contagem e
+    # à tradução
     with open(input_file, "r") as infile:
-        for line in infile:
-            line = line.split("#")[0].strip() 
-            if not line:
-                continue
-
-            if line.startswith(".data"):
-                IN_DATA_SECTION = True
-                continue
-            elif line.startswith(".text"):
-                IN_DATA_SECTION = False
-                continue
-            elif line.startswith(".globl"):
-                continue
-
-            if IN_DATA_SECTION:
-                parts = line.split()
-                if len(parts) < 3:
-                    print(f"Error: Invalid .data directive: {line}")
-                    continue
-
-                label = parts[0].strip(":")
-                directive = parts[1]
-                value = " ".join(parts[2:])
-                if directive == ".word":
-                    DATA_SECTION[label] = int(value)
-                elif directive == ".asciiz":
-                    DATA_SECTION[label] = value.strip('"')
-                else:
-                    print(f"Warning: Unsupported data directive: {directive}")
-                continue
-
-            if ":" in line:
-                label = line.split(":")[0]
-                LABELS[label] = ADDRESS_COUNTER
-                continue
-
-            ADDRESS_COUNTER += 4
-
-def pass_two(input_file, output_file):
-    global ADDRESS_COUNTER
-    ADDRESS_COUNTER = 0
-
-    with open(input_file, "r") as infile, open(output_file, "wb") as outfile: 
-        for line in infile:
-            line = line.split("#")[0].strip() 
-            if not line or line.startswith(".") or ":" in line:
+        lines = [line.split("#")[0].strip() for line in infile]
+
+    # Buffer de saída pré-alocado com o número exato de instruções (mesmo
+    # filtro do laço de tradução): escrita por índice, sem os realocamentos
+    # de crescimento do append — e o backpatch dos fixups escreve no lugar
+    n_instr = sum(1 for line in lines if line and not line.startswith(".") and ":" not in line)
+    words = array.array("I", bytes(4 * n_instr))
+    idx = 0
+    fixups = []  # (índice em words, instr, rótulo, endereço, campos já codificados)
+
+    for line in lines:
+        if not line:
+            continue
+
+        if line.startswith(".data"):
+            IN_DATA_SECTION = True
+            continue
+        elif line.startswith(".text"):
+            IN_DATA_SECTION = False
+            continue
+        elif line.startswith(".globl"):
+            continue
+
+        if IN_DATA_SECTION:
+            parts = line.split()
+            if len(parts) < 3:
+                print(f"Error: Invalid .data directive: {line}")
                 continue
 
-            try:
+            label = parts[0].strip(":")
+            directive = parts[1]
+            value = " ".join(parts[2:])
+            if directive == ".word":
+                DATA_SECTION[label] = int(value)
+            elif directive == ".asciiz":
+                DATA_SECTION[label] = value.strip('"')
+            else:
+                print(f"Warning: Unsupported data directive: {directive}")
+            continue
+
+        if ":" in line:
+            LABELS[line.split(":")[0]] = ADDRESS_COUNTER
+            continue
+
+        parts = _TOKEN_RE.split(line)
+        instr = parts[0]
+        try:
+            if instr in {"beq", "bne"} and len(parts) >= 4 and parts[3] not in LABELS:
+                # referência adiante: opcode e registradores já codificados,
+                # o deslocamento entra no fixup (a palavra provisória já é 0)
+                partial = (OPCODES[instr] << 26) | (parse_register(parts[2]) << 21) | (parse_register(parts[1]) << 16)
+                fixups.append((idx, instr, parts[3], ADDRESS_COUNTER, partial))
+                idx += 1
+                ADDRESS_COUNTER += 4
+            elif instr in {"j", "jal"} and len(parts) >= 2 and parts[1] not in LABELS:
+                fixups.append((idx, instr, parts[1], ADDRESS_COUNTER, OPCODES[instr] << 26))
+                idx += 1
+                ADDRESS_COUNTER += 4
+            else:
                 binary = translate_line(line)
-                if binary:
-                    instruction_int = int(binary, 2)
-                    instruction_bytes = struct.pack(">I", instruction_int) 
-                    outfile.write(instruction_bytes) 
-            except ValueError as e:
-                print(f"Error in line '{line}': {e}")
+                if binary is not None:
+                    words[idx] = binary
+                    idx += 1
+        except ValueError as e:
+            print(f"Error in line '{line}': {e}")
+
+    # linhas com erro não emitem palavra: descarta a sobra pré-alocada
+    del words[idx:]
+
+    for index, instr, label, address, partial in fixups:
+        if label not in LABELS:
+            print(f"Error: Undefined label '{label}'")
+            continue
+        if instr in {"beq", "bne"}:
+            offset = (LABELS[label] - (address + 4)) // 4
+            words[index] = partial | parse_immediate(offset)
+        else:
+            words[index] = partial | parse_address(LABELS[label] // 4)
+
+    if sys.byteorder == "little":
+        words.byteswap()  # o arquivo de saída é big-endian
+    with open(output_file, "wb") as outfile:
+        outfile.write(words.tobytes())
 
 
 if __name__ == "__main__":
     INPUT_FILE = "output.asm"
     OUTPUT_FILE = "output.bin"
 
-    print("Performing Pass One...")
-    pass_one(INPUT_FILE)
-    print("Pass One complete. Labels and Data Section collected.")
-
-    print(f"Performing Pass Two to translate {INPUT_FILE} to binary...")
-    pass_two(INPUT_FILE, OUTPUT_FILE)
+    print(f"Assembling {INPUT_FILE} in a single pass...")
+    assemble(INPUT_FILE, OUTPUT_FILE)
     print(f"Translation complete. Binary file saved to {OUTPUT_FILE}.")
\ No newline at end of file
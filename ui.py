@@ -4,26 +4,38 @@ from minijava_scanner import MiniJavaScanner
 from minijava_parser import MiniJavaParserLL1
 from graphviz import Digraph
 
-def draw_syntax_tree(tree, graph=None, parent_name=None):
-    if graph is None:
-        graph = Digraph()
-        graph.node("root", "Program")
-        parent_name = "root"
-
-    if isinstance(tree, dict):
-        node_name = f"{parent_name}_{id(tree)}"
-        graph.node(node_name, tree.get("type", "Unknown"))
-        graph.edge(parent_name, node_name)
-        for key, value in tree.items():
-            if key != "type":
-                draw_syntax_tree(value, graph, node_name)
-    elif isinstance(tree, list):
-        for item in tree:
-            draw_syntax_tree(item, graph, parent_name)
-    else:
-        node_name = f"{parent_name}_{id(tree)}"
-        graph.node(node_name, str(tree))
-        graph.edge(parent_name, node_name)
+def draw_syntax_tree(syntax_tree):
+    # Travessia iterativa com pilha explícita: sem limite de recursão em
+    # árvores profundas. Nós e arestas acumulam em listas e entram no grafo
+    # de uma vez ao final; um contador gera nomes únicos (id() colidiria nos
+    # nós folha compartilhados pelo parser)
+    nodes = [("root", "Program")]
+    edges = []
+    stack = [(syntax_tree, "root")]
+    counter = 0
+    while stack:
+        tree, parent_name = stack.pop()
+        if isinstance(tree, list):
+            # empilhado em ordem inversa para desenhar na ordem do fonte
+            for item in reversed(tree):
+                stack.append((item, parent_name))
+            continue
+        counter += 1
+        node_name = f"n{counter}"
+        edges.append((parent_name, node_name))
+        if isinstance(tree, dict):
+            nodes.append((node_name, tree.get("type", "Unknown")))
+            for key in reversed(list(tree)):
+                if key != "type":
+                    stack.append((tree[key], node_name))
+        else:
+            nodes.append((node_name, str(tree)))
+
+    graph = Digraph()
+    for name, label in nodes:
+        graph.node(name, label)
+    for parent_name, name in edges:
+        graph.edge(parent_name, name)
     return graph
 
 def generate_tree():